@@ -4,6 +4,9 @@ from .table_measures import *
 from .table_tests import *
 from .random_variables import *
 from .intervals import *
+from .results import *
+from .batch import *
+from .posterior import *
 
 from pkg_resources import get_distribution, DistributionNotFound
 try:
@@ -0,0 +1,210 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+"""Batch.
+
+Allows for the ratios, chi squared tests and credible intervals of more tables
+than fit in memory to be calculated in one job (run_batch). The counts are
+read in chunks from memory-mapped .npy files and the results are written to
+memory-mapped .npy files in an output directory, so the memory used does not
+grow with the number of tables.
+
+After every chunk the outputs are flushed and the number of finished tables
+is written to a checkpoint file, and running the same job again resumes from
+there.
+
+"""
+
+#from builtins import *
+import io
+import json
+import os
+
+import numpy as np
+from scipy.stats.distributions import chi2
+
+from .intervals import FIT_ERRORS, eqt_int_frac, hpd_int_frac
+from .results import RESULT_DTYPE
+
+# Number of tables read and written at a time
+CHUNK_SIZE = 1024
+# Fields of the output holding the ratios and chi squared test of each table
+TABLE_DTYPE = np.dtype([('rel_risk', np.float64), ('odds_rat', np.float64),
+                        ('chi_sq_stat', np.float64), ('chi_sq_prob', np.float64)])
+# Name of the checkpoint file in the output directory
+CHECKPOINT = 'checkpoint.json'
+
+
+def _table_measures(p_arr, c_arr, m_arr, n_arr):
+    """Ratios and chi squared test of a chunk of tables, as in rel_risk,\
+    odds_rat and chi_sq_test."""
+    out = np.empty(len(p_arr), dtype=TABLE_DTYPE)
+    p_arr, c_arr, m_arr, n_arr = (arr.astype(np.float64)
+                                  for arr in (p_arr, c_arr, m_arr, n_arr))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['rel_risk'] = p_arr * n_arr / (c_arr * m_arr)
+        out['odds_rat'] = p_arr * (n_arr - c_arr) / (c_arr * (m_arr - p_arr))
+        out['chi_sq_stat'] = ((m_arr + n_arr) *
+                              (p_arr * (n_arr - c_arr) - (m_arr - p_arr) * c_arr) ** 2 /
+                              ((p_arr + c_arr) * (n_arr - c_arr + m_arr - p_arr) *
+                               m_arr * n_arr))
+    out['chi_sq_prob'] = chi2.sf(out['chi_sq_stat'], 1)
+    return out
+
+
+def _write_checkpoint(path, state):
+    """Replaces the checkpoint file in one step, so it is never half written."""
+    with io.open(path + '.tmp', 'wb') as stream:
+        stream.write(json.dumps(state, sort_keys=True).encode('utf8'))
+    try:
+        os.replace(path + '.tmp', path)
+    except AttributeError:
+        # Python 2.7 has no os.replace, and rename only replaces on POSIX
+        if os.name == 'nt' and os.path.exists(path):
+            os.remove(path)
+        os.rename(path + '.tmp', path)
+
+
+def run_batch(p_path, c_path, m_path, n_path, out_dir, pri_path=None,
+              pri_val=(0, 0, 0, 0), frac_type='risk', signif=0.05,
+              int_types=('equal', 'hpd'), ans='numeric', chunk_size=CHUNK_SIZE,
+              progress=None):
+    """Calculates the ratios, chi squared tests and credible intervals of the\
+    tables held in .npy files, writing the results to .npy files.
+
+    Parameters
+    ==========
+
+    p_path : .npy file of the numbers of exposed in group one
+    c_path : .npy file of the numbers of exposed in group two
+    m_path : .npy file of the totals in group one
+    n_path : .npy file of the totals in group two
+    out_dir : Directory the results and the checkpoint are written to
+    pri_path : Optional .npy file with one row of belief parameters\
+                (pi_1, pi_2, pi_3, pi_4) per table, used instead of pri_val
+    pri_val : Tuple containing belief parameters for the two beta distributions,\
+                B(c_val + pi_1, n_val - c_val + pi_2) and B(p_val + pi_3, m_val - p_val + pi_4),\
+                given in the order: pi_1, pi_2, pi_3, pi_4
+    frac_type : Desired ratio - relative risk ("risk") or odds ratio ("odds")
+    signif : Significance cut off desired
+    int_types : Desired interval types - any of highest posterior density\
+                ("hpd") and equal-tailed ("equal")
+    ans : Desired results - "estim" or "numeric", as in eqt_int_frac
+    chunk_size : Number of tables read and written at a time
+    progress : Optional function called with the number of finished tables\
+                and the number of tables after every chunk
+
+    Returns
+    =======
+
+    A dictionary with the paths of the outputs: "tables" (TABLE_DTYPE) and\
+        one per interval type (RESULT_DTYPE), plus the number of tables whose\
+        intervals could not be calculated ("failed"); their bounds are NaN
+
+    Raises
+    ======
+
+    TypeError
+        Count inputs must be integers
+    ValueError
+        Count inputs must be one dimensional arrays of the same length
+        Priors must have one row of four values per table
+        Significance level must be between 0 and 1
+        frac_type must be "risk" or "odds"
+        int_types must only hold "hpd" and "equal"
+        ans must be "estim" or "numeric"
+        Checkpoint does not match this job
+    NotImplementedError
+        numerical intervals of odds ratio not currently implemented
+
+    See Also
+    =======
+
+    interval_batch : Intervals of tables held in memory
+
+    Examples
+    ========
+
+    >>> paths = run_batch('p.npy', 'c.npy', 'm.npy', 'n.npy', 'results')
+    >>> numpy.load(paths['equal'], mmap_mode='r')['lower']
+    memmap([0.32124705, 0.38805862, ...])
+
+    """
+    counts = [np.load(path, mmap_mode='r') for path in (p_path, c_path, m_path, n_path)]
+    if not all(np.issubdtype(arr.dtype, np.integer) for arr in counts):
+        raise TypeError('Count inputs must be integers')
+    size = len(counts[0])
+    if any(arr.ndim != 1 or len(arr) != size for arr in counts):
+        raise ValueError('Count inputs must be one dimensional arrays of the same length')
+    priors = None
+    if pri_path is not None:
+        priors = np.load(pri_path, mmap_mode='r')
+        if priors.shape != (size, 4):
+            raise ValueError('Priors must have one row of four values per table')
+    if not 0 <= signif <= 1:
+        raise ValueError('Significance level must be between 0 and 1')
+    if frac_type not in ('risk', 'odds'):
+        raise ValueError('frac_type must be "risk" or "odds"')
+    if not set(int_types) <= set(('equal', 'hpd')):
+        raise ValueError('int_types must only hold "hpd" and "equal"')
+    if ans not in ('estim', 'numeric'):
+        raise ValueError('ans must be "estim" or "numeric"')
+    if ans == 'numeric' and frac_type == 'odds':
+        raise NotImplementedError('numerical intervals of odds ratio not currently implemented')
+
+    settings = {'inputs': [os.path.abspath(path) for path in
+                           (p_path, c_path, m_path, n_path)],
+                'priors': None if pri_path is None else os.path.abspath(pri_path),
+                'pri_val': [float(val) for val in pri_val], 'frac_type': frac_type,
+                'signif': signif, 'int_types': list(int_types), 'ans': ans, 'size': size}
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    checkpoint = os.path.join(out_dir, CHECKPOINT)
+    paths = dict((name, os.path.join(out_dir, name + '.npy'))
+                 for name in ('tables',) + tuple(int_types))
+    if os.path.exists(checkpoint):
+        with io.open(checkpoint, encoding='utf8') as stream:
+            state = json.load(stream)
+        if state['settings'] != settings:
+            raise ValueError('Checkpoint does not match this job, use another out_dir')
+        mode = 'r+'
+    else:
+        state = {'settings': settings, 'done': 0, 'failed': 0}
+        mode = 'w+'
+    outputs = dict((name, np.lib.format.open_memmap(
+        path, mode=mode, dtype=TABLE_DTYPE if name == 'tables' else RESULT_DTYPE,
+        shape=(size,))) for name, path in paths.items())
+    if mode == 'w+':
+        _write_checkpoint(checkpoint, state)
+
+    intervals = {'equal': lambda table, pri: eqt_int_frac(
+                     *table, pri_val=pri, frac_type=frac_type, signif=signif, ans=ans),
+                 'hpd': lambda table, pri: hpd_int_frac(
+                     *table, pri_val=pri, frac_type=frac_type, signif=signif,
+                     minimisation_start=None, ans=ans)}
+    for start in range(state['done'], size, chunk_size):
+        stop = min(start + chunk_size, size)
+        chunk = [np.array(arr[start:stop]) for arr in counts]
+        outputs['tables'][start:stop] = _table_measures(*chunk)
+        chunk_priors = (np.array(priors[start:stop]) if priors is not None
+                        else [tuple(pri_val)] * (stop - start))
+        for row, table in enumerate(zip(*(arr.tolist() for arr in chunk))):
+            pri = tuple(chunk_priors[row])
+            failed = False
+            for int_type in int_types:
+                try:
+                    result = tuple(float(val) for val in intervals[int_type](table, pri))
+                except FIT_ERRORS:
+                    # One table that cannot be fitted must not stop the job
+                    result = (np.nan, np.nan, np.nan)
+                    failed = True
+                outputs[int_type][start + row] = table + result
+            state['failed'] += failed
+        for output in outputs.values():
+            output.flush()
+        state['done'] = stop
+        _write_checkpoint(checkpoint, state)
+        if progress is not None:
+            progress(stop, size)
+    paths['failed'] = state['failed']
+    return paths
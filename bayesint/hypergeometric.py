@@ -0,0 +1,626 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+"""Hypergeometric functions.
+
+Allows for the numerical evaluation of the hypergeometric terms in the density
+(densi_series) and distribution (distri_series) of a ratio of two independent
+beta distributions, X / Y with X ~ B(theta, phi) and Y ~ B(alpha, b), on the
+branch 0 <= z <= 1 (the z > 1 branch is the same function with the two beta
+distributions swapped). The distribution at the switch point z = 1 is given
+by distri_unit.
+
+The series in densi_frac and distri_frac alternate in sign and cancel
+catastrophically, which is why mpmath has to raise its working precision to
+sum them. Here they are first transformed so that every term is positive:
+
+* away from z = 1, Euler's transformation
+  2F1(a, b; c; z) = (1 - z)^(c - a - b) 2F1(c - a, c - b; c; z), with the
+  3F2 written as a mixture of incomplete beta functions of that series;
+* near z = 1, the connection formula in powers of 1 - z, keeping only the part
+  analytic at z = 1 (it is exact when phi is an integer, and the other part is
+  checked to be negligible otherwise);
+* at z = 1, Thomae's transformation of the 3F2, which turns a series
+  converging like n^-(b + phi + 1) with huge alternating terms into one with
+  positive terms converging like n^-(theta + 1). Those terms only start to
+  fall off once n is well past b + phi, so when UNIT_TERMS terms are not
+  enough the value is taken by quadrature instead (_unit_quad).
+
+When phi is an integer and b >= 1 (integer counts and priors) the 2F1 is a
+polynomial of degree phi - 1, and in powers of 1 - z its coefficients are all
+positive. Both the density and the distribution are then such polynomials on
+the whole of 0 <= z <= 1, with no series to truncate, and are evaluated from
+their log coefficients by Horner's rule (_horner) or, for a few points, as one
+sum of terms.
+
+All sums are carried out on logarithms of the terms, so no intermediate
+value over- or underflows. The terms of each series are a coefficient that
+does not depend on z times a power of z (or of 1 - z), so an array of z is
+sorted and split into blocks of neighbouring values that share one set of
+terms, generated at the largest z of the block and moved to the others with
+(z / z_top)^n; each block is then summed as one array operation.
+
+Where none of the above applies (very small counts right next to z = 1) the
+evaluation falls back to mpmath point by point, using a context private to
+the calling thread so that the working precision mpmath raises and restores
+is never shared between threads.
+
+"""
+
+#from builtins import *
+import threading
+
+import mpmath
+import numpy as np
+from scipy.special import betainc, betaln, gammaln
+
+from .quadrature import ORDER, PANELS, distri_quad
+
+# Log of the relative size below which series terms are neglected
+LOG_TOL = np.log(np.finfo(float).eps) - 4.0
+# Number of series terms generated at once
+BLOCK = 256
+# Largest number of series terms summed before falling back to mpmath
+MAX_TERMS = 200000
+# Below this z the Euler transformed series is always used
+Z_EULER = 0.5
+# Number of terms of the series at z = 1 summed before using quadrature
+UNIT_TERMS = 16 * 1024
+# Largest difference between quadrature rules of two orders accepted at z = 1
+UNIT_QUAD_TOL = 1e-13
+# Largest number of panels of the quadrature at z = 1
+UNIT_PANELS = 64
+# Number of neighbouring values of z sharing one set of series terms
+CURVE_BLOCK = 512
+# Number of values of z from which polynomials are evaluated by Horner's rule
+HORNER_POINTS = 256
+# Factor by which the partial sums of Horner's rule are scaled down
+HORNER_SCALE = 2.0 ** 500
+
+_LOCAL = threading.local()
+
+
+def _log_terms(log_ratio, log_first, limit, max_terms=MAX_TERMS):
+    """Logarithms of the terms of a series with positive terms.
+
+    Parameters
+    ==========
+
+    log_ratio : Function giving log(t_(n + 1) / t_n) for an array of n
+    log_first : Logarithm of the first term, t_0
+    limit : Limit of the term ratio as n tends to infinity (less than 1)
+    max_terms : Largest number of terms generated
+
+    Returns
+    =======
+
+    An array with log(t_0), log(t_1), ..., ending once the remaining terms\
+        are negligible, or None when that takes more than max_terms terms
+
+    """
+    blocks = [np.array([log_first])]
+    last = top = log_first
+    start = 0
+    while start < max_terms:
+        ratios = log_ratio(np.arange(start, start + BLOCK, dtype=float))
+        block = last + np.cumsum(ratios)
+        blocks.append(block)
+        last = block[-1]
+        top = max(top, block.max())
+        start += BLOCK
+        # Later ratios are at most rho, so the tail is at most t_N / (1 - rho)
+        rho = max(np.exp(ratios[-1]), limit)
+        if rho < 1 and last - np.log1p(-rho) < top + LOG_TOL:
+            return np.concatenate(blocks)
+    return None
+
+
+def _logsumexp(log_terms):
+    """Log of the sum of exp(log_terms), without scipy's per-call overhead."""
+    top = np.max(log_terms)
+    if not np.isfinite(top):
+        return top
+    return top + np.log(np.sum(np.exp(log_terms - top)))
+
+
+def _logsumexp_shifted(log_terms, shift):
+    """Log of the sum of exp(log_terms[n] + n shift), for a number or an\
+    array of shift (one sum per value)."""
+    shift = np.asarray(shift, dtype=float)
+    if not shift.ndim:
+        return _logsumexp(log_terms + shift * np.arange(len(log_terms)))
+    rows = log_terms + np.multiply.outer(shift, np.arange(len(log_terms)))
+    top = np.max(rows, axis=-1)
+    with np.errstate(invalid='ignore'):
+        out = top + np.log(np.sum(np.exp(rows - top[:, None]), axis=-1))
+    return np.where(np.isfinite(top), out, top)
+
+
+def _log_norm(theta, phi, alpha, b):
+    """Log of the constant B(alpha + theta, b) / (B(alpha, b) B(theta, phi))."""
+    return betaln(alpha + theta, b) - betaln(alpha, b) - betaln(theta, phi)
+
+
+def _euler_densi(z_val, theta, phi, alpha, b):
+    """Log density from Euler's transformation, or None if too many terms.
+
+    For an array of z the terms are generated at the largest one.
+    """
+    big_a = alpha + theta + b + phi - 1
+    c_val = alpha + theta + b
+    log_z = np.log(z_val)
+    log_top = np.max(log_z)
+    terms = _log_terms(lambda n: (np.log(b + n) + np.log(big_a + n) + log_top -
+                                  np.log(c_val + n) - np.log1p(n)),
+                       0., np.exp(log_top))
+    if terms is None:
+        return None
+    return (_log_norm(theta, phi, alpha, b) + (theta - 1) * log_z +
+            (b + phi - 1) * np.log1p(-z_val) + _logsumexp_shifted(terms, log_z - log_top))
+
+
+def _euler_distri(z_val, theta, phi, alpha, b):
+    """Distribution from Euler's transformation, or None if too many terms.
+
+    The distribution is sum_n p_n I_z(theta + n, b + phi) with p_n >= 0, and
+    writing I_z(theta + n, b + phi) = sum_(k >= n) d_k turns it into
+    sum_k d_k P_k with P_k = p_0 + ... + p_k. For an array of z the terms are
+    generated at the largest one.
+    """
+    big_a = alpha + theta + b + phi - 1
+    c_val = alpha + theta + b
+    log_z = np.log(z_val)
+    log_top = np.max(log_z)
+    log_first = lambda log_val: (gammaln(theta + b + phi) - gammaln(theta + 1) -
+                                 gammaln(b + phi) + theta * log_val +
+                                 (b + phi) * np.log1p(-np.exp(log_val)))
+    log_d = _log_terms(lambda k: (log_top + np.log(theta + b + phi + k) -
+                                  np.log(theta + 1 + k)),
+                       log_first(log_top), np.exp(log_top))
+    if log_d is None:
+        return None
+    n = np.arange(len(log_d) - 1, dtype=float)
+    log_p = (_log_norm(theta, phi, alpha, b) + betaln(theta, b + phi) +
+             np.concatenate(([0.], np.cumsum(
+                 np.log(b + n) + np.log(big_a + n) + np.log(theta + n) -
+                 np.log(c_val + n) - np.log1p(n) - np.log(theta + b + phi + n)))))
+    return np.exp(log_first(log_z) - log_first(log_top) + _logsumexp_shifted(
+        log_d + np.logaddexp.accumulate(log_p), log_z - log_top))
+
+
+def _reflected_coefs(theta, phi, alpha, b):
+    """Logs of the coefficients e_n of the series in y = 1 - z, kept while\
+    they are positive, and of the constant C0; neither depends on y."""
+    m_val = b + phi - 1
+    big_a = alpha + theta + b + phi - 1
+    c_val = alpha + theta + b
+    # Terms stay positive while both 1 - phi + n and 1 - m + n are negative
+    last = int(np.ceil(min(phi, m_val))) - 1
+    n = np.arange(last, dtype=float)
+    coefs = np.concatenate(([0.], np.cumsum(
+        np.log(alpha + theta + n) + np.log(phi - 1 - n) -
+        np.log(m_val - 1 - n) - np.log1p(n))))
+    return coefs, gammaln(c_val) + gammaln(m_val) - gammaln(b) - gammaln(big_a)
+
+
+def _truncated(coefs, log_top):
+    """Leading log coefficients of a series with positive terms, leaving\
+    out a tail below LOG_TOL of the sum at y = exp(log_top).
+
+    The tail beyond any term, relative to the whole sum, grows with y, so
+    the series so truncated is as accurate at every smaller y, and in every
+    integral over y from 0 to at most exp(log_top).
+    """
+    log_tails = np.logaddexp.accumulate(
+        (coefs + log_top * np.arange(len(coefs)))[::-1])[::-1]
+    return coefs[:max(np.count_nonzero(log_tails > log_tails[0] + LOG_TOL), 1)]
+
+
+def _reflected_terms(y_val, theta, phi, alpha, b):
+    """Log coefficients and log constant of the series in y = 1 - z.
+
+    Near z = 1, 2F1(alpha + theta, 1 - phi; alpha + theta + b; z) is
+    C0 sum_n e_n y^n plus a part of order y^(b + phi - 1). This returns the
+    logs of the coefficients e_n, cut where the rest is negligible at the
+    largest y, and of C0, and whether the series in y can be truncated with
+    the neglected part negligible at y (a bool, or an array of them for an
+    array of y).
+    """
+    m_val = b + phi - 1
+    big_a = alpha + theta + b + phi - 1
+    c_val = alpha + theta + b
+    log_y = np.log(y_val)
+    log_top = np.max(log_y)
+    coefs, log_c0 = _reflected_coefs(theta, phi, alpha, b)
+    kept = _truncated(coefs, log_top)
+    phi_int = phi == np.floor(phi)
+    exact = ((phi_int and phi <= m_val) or
+             (m_val == np.floor(m_val) and m_val <= phi))
+    usable = np.ones(np.shape(y_val), dtype=bool)
+    if exact and phi_int:
+        return kept, log_c0, usable if usable.ndim else True
+    log_sum = _logsumexp_shifted(kept, log_y)
+    if not exact:
+        usable &= coefs[-1] + (len(coefs) - 1) * log_y <= log_sum + LOG_TOL
+    if not phi_int:
+        # Size of the part of order y^m, with 1 / Gamma(1 - phi) != 0
+        tail = _log_terms(lambda k: (np.log(b + k) + np.log(big_a + k) + log_top -
+                                     np.log(m_val + 1 + k) - np.log1p(k)),
+                          0., np.exp(log_top))
+        if tail is None:
+            usable &= False
+        else:
+            log_part = (gammaln(c_val) - gammaln(alpha + theta) - gammaln(1 - phi) -
+                        gammaln(m_val + 1) + m_val * log_y +
+                        _logsumexp_shifted(tail, log_y - log_top) +
+                        np.log(abs(log_y) + 2 * np.log(c_val + phi) + 2) +
+                        np.log(np.pi / max(abs(np.sin(np.pi * m_val)), 1e-3)))
+            usable &= log_part <= np.minimum(log_c0 + log_sum, 0.) + LOG_TOL
+    return kept, log_c0, usable if usable.ndim else bool(usable)
+
+
+def _reflected_integral(y_val, coefs, theta):
+    """Log of sum_n e_n B(n + 1, theta) I_y(n + 1, theta), the series in y\
+    integrated term by term from z to 1, for a number or an array of y.
+
+    Only the last incomplete beta function is evaluated; the others follow
+    from I_y(a, theta) = I_y(a + 1, theta) + y^a (1 - y)^theta / (a B(a, theta)),
+    which only adds positive terms.
+    """
+    log_y = np.log(np.asarray(y_val, dtype=float))[..., None]
+    a_val = np.arange(1, len(coefs) + 1, dtype=float)
+    log_steps = (a_val[:-1] * log_y + theta * np.log1p(-np.exp(log_y)) -
+                 np.log(a_val[:-1]) - betaln(a_val[:-1], theta))
+    with np.errstate(divide='ignore'):
+        log_last = np.log(betainc(a_val[-1], theta, np.exp(log_y)))
+    log_int = np.logaddexp.accumulate(
+        np.concatenate((log_steps, log_last), axis=-1)[..., ::-1], axis=-1)[..., ::-1]
+    rows = coefs + betaln(a_val, theta) + log_int
+    top = np.max(rows, axis=-1)
+    return top + np.log(np.sum(np.exp(rows - top[..., None]), axis=-1))
+
+
+def _horner(log_coefs, y_arr):
+    """Log of the polynomial sum_n exp(log_coefs[n]) y^n with positive\
+    coefficients, at every y of an array, by Horner's rule.
+
+    The rule is run on the ratios of neighbouring coefficients,
+    p(y) = c_0 (1 + r_1 y (1 + r_2 y (1 + ...))), and a partial sum that grows
+    past HORNER_SCALE is scaled down, its log scale kept separately.
+    """
+    ratios = np.exp(np.diff(log_coefs))
+    acc = np.ones(y_arr.shape)
+    unit = np.ones(y_arr.shape)
+    log_scale = np.zeros(y_arr.shape)
+    for ratio in ratios[::-1]:
+        acc = unit + ratio * y_arr * acc
+        big = acc > HORNER_SCALE
+        if big.any():
+            acc[big] /= HORNER_SCALE
+            unit[big] /= HORNER_SCALE
+            log_scale[big] += np.log(HORNER_SCALE)
+    return log_coefs[0] + np.log(acc) + log_scale
+
+
+def _poly(log_coefs, y_arr):
+    """Log of sum_n exp(log_coefs[n]) y^n, by Horner's rule for many y and\
+    as one sum of terms for a few."""
+    if y_arr.size >= HORNER_POINTS:
+        return _horner(log_coefs, y_arr)
+    out = np.full(y_arr.shape, log_coefs[0])
+    pos = y_arr > 0
+    out[pos] = _logsumexp_shifted(log_coefs, np.log(y_arr[pos]))
+    return out
+
+
+def _integer_coefs(theta, phi, alpha, b):
+    """Log coefficients of the density and distribution as polynomials in\
+    y = 1 - z, when phi is an integer and b >= 1, or None otherwise.
+
+    The density is N C0 z^(theta - 1) sum_n e_n y^n (the series in y is then
+    exact), and integrating x^(theta - 1) (1 - x)^n from 0 to z term by term,
+    with I_z(theta, n + 1) = sum_(j <= n) binom(theta + j - 1, j) z^theta y^j,
+    makes the distribution N C0 z^theta sum_j g_j y^j with
+    g_j = binom(theta + j - 1, j) sum_(n >= j) e_n B(theta, n + 1).
+    Returns log(N C0) and the logs of e_n and of g_j.
+    """
+    if phi != np.floor(phi) or b < 1:
+        return None
+    coefs, log_c0 = _reflected_coefs(theta, phi, alpha, b)
+    # B(theta, n + 1) and binom(theta + j - 1, j) from the ratios of
+    # neighbouring values, which keeps the logs small
+    k_val = np.arange(1, len(coefs), dtype=float)
+    log_beta = np.concatenate(([-np.log(theta)], -np.log(theta) + np.cumsum(
+        np.log(k_val) - np.log(theta + k_val))))
+    log_binom = np.concatenate(([0.], np.cumsum(np.log(theta + k_val - 1) - np.log(k_val))))
+    log_s = np.logaddexp.accumulate((coefs + log_beta)[::-1])[::-1]
+    return _log_norm(theta, phi, alpha, b) + log_c0, coefs, log_binom + log_s
+
+
+def _integer_evaluate(z_val, theta, log_const, log_coefs, power, at_zero):
+    """Evaluates exp(log_const) z^power p(1 - z), with p the polynomial of\
+    log_coefs, at a number or an array of 0 <= z <= 1."""
+    z_arr = np.asarray(z_val, dtype=float)
+    out = np.full(z_arr.shape, at_zero)
+    pos = z_arr > 0
+    z_pos = np.minimum(z_arr[pos], 1)
+    out[pos] = np.exp(log_const + power * np.log(z_pos) + _poly(log_coefs, 1 - z_pos))
+    return out if out.ndim else float(out)
+
+
+def _mp_context():
+    """mpmath context of the calling thread, created on first use."""
+    ctx = getattr(_LOCAL, 'ctx', None)
+    if ctx is None:
+        ctx = _LOCAL.ctx = mpmath.MPContext()
+    return ctx
+
+
+def _mpmath_densi(z_val, theta, phi, alpha, b):
+    """Density from mpmath, used when no series applies."""
+    ctx = _mp_context()
+    return float(ctx.exp(_log_norm(theta, phi, alpha, b)) *
+                 ctx.mpf(z_val) ** (theta - 1) *
+                 ctx.hyp2f1(alpha + theta, 1 - phi, alpha + theta + b, z_val))
+
+
+def _mpmath_distri(z_val, theta, phi, alpha, b):
+    """Distribution from mpmath, used when no series applies."""
+    ctx = _mp_context()
+    return float(ctx.exp(_log_norm(theta, phi, alpha, b)) *
+                 ctx.mpf(z_val) ** theta / theta *
+                 ctx.hyp3f2(1 - phi, alpha + theta, theta,
+                            alpha + theta + b, theta + 1, z_val))
+
+
+def _densi_point(z_val, theta, phi, alpha, b, memo):
+    """Density of X / Y at a single 0 <= z <= 1."""
+    if z_val <= 0:
+        return np.exp(_log_norm(theta, phi, alpha, b)) if theta == 1 else \
+            (0. if theta > 1 else np.inf)
+    log_norm = _log_norm(theta, phi, alpha, b)
+    if z_val >= 1:
+        # Gauss's sum, 2F1(a, b; c; 1) = Gamma(c) Gamma(c - a - b) / ...
+        return np.exp(log_norm + gammaln(alpha + theta + b) + gammaln(b + phi - 1) -
+                      gammaln(b) - gammaln(alpha + theta + b + phi - 1))
+    if z_val > Z_EULER:
+        coefs, log_c0, usable = _reflected_terms(1 - z_val, theta, phi, alpha, b)
+        if usable:
+            return np.exp(log_norm + (theta - 1) * np.log(z_val) + log_c0 +
+                          _logsumexp_shifted(coefs, np.log1p(-z_val)))
+    log_dens = _euler_densi(z_val, theta, phi, alpha, b)
+    if log_dens is None:
+        return _mpmath_densi(z_val, theta, phi, alpha, b)
+    return np.exp(log_dens)
+
+
+def _distri_point(z_val, theta, phi, alpha, b, memo):
+    """Distribution of X / Y at a single 0 <= z <= 1.
+
+    The value at z = 1 is kept in memo, so that it is worked out once for all
+    the points of one call.
+    """
+    if 'unit' not in memo and z_val > Z_EULER:
+        memo['unit'] = distri_unit(theta, phi, alpha, b)
+    if z_val <= 0:
+        return 0.
+    if z_val >= 1:
+        return memo['unit']
+    if z_val > Z_EULER:
+        coefs, log_c0, usable = _reflected_terms(1 - z_val, theta, phi, alpha, b)
+        if usable:
+            return memo['unit'] - np.exp(
+                _log_norm(theta, phi, alpha, b) + log_c0 +
+                _reflected_integral(1 - z_val, coefs, theta))
+    dist = _euler_distri(z_val, theta, phi, alpha, b)
+    if dist is None:
+        return _mpmath_distri(z_val, theta, phi, alpha, b)
+    return dist
+
+
+def _densi_block(z_arr, theta, phi, alpha, b, memo):
+    """Density of X / Y at a sorted array of 0 <= z <= 1 sharing the terms\
+    of one series, point by point where no shared series applies."""
+    out = np.full(z_arr.shape, np.nan)
+    reflect = (z_arr > Z_EULER) & (z_arr < 1)
+    if reflect.any():
+        coefs, log_c0, usable = _reflected_terms(1 - z_arr[reflect], theta, phi, alpha, b)
+        reflect[reflect] = usable
+        out[reflect] = np.exp(_log_norm(theta, phi, alpha, b) +
+                              (theta - 1) * np.log(z_arr[reflect]) + log_c0 +
+                              _logsumexp_shifted(coefs, np.log1p(-z_arr[reflect])))
+    euler = (z_arr > 0) & (z_arr < 1) & ~reflect
+    if euler.any():
+        log_dens = _euler_densi(z_arr[euler], theta, phi, alpha, b)
+        if log_dens is not None:
+            out[euler] = np.exp(log_dens)
+    for idx in np.flatnonzero(np.isnan(out)):
+        out[idx] = _densi_point(z_arr[idx], theta, phi, alpha, b, memo)
+    return out
+
+
+def _distri_block(z_arr, theta, phi, alpha, b, memo):
+    """Distribution of X / Y at a sorted array of 0 <= z <= 1 sharing the\
+    terms of one series, point by point where no shared series applies."""
+    out = np.full(z_arr.shape, np.nan)
+    reflect = (z_arr > Z_EULER) & (z_arr < 1)
+    if reflect.any():
+        if 'unit' not in memo:
+            memo['unit'] = distri_unit(theta, phi, alpha, b)
+        coefs, log_c0, usable = _reflected_terms(1 - z_arr[reflect], theta, phi, alpha, b)
+        reflect[reflect] = usable
+        out[reflect] = memo['unit'] - np.exp(
+            _log_norm(theta, phi, alpha, b) + log_c0 +
+            _reflected_integral(1 - z_arr[reflect], coefs, theta))
+    euler = (z_arr > 0) & (z_arr < 1) & ~reflect
+    if euler.any():
+        dist = _euler_distri(z_arr[euler], theta, phi, alpha, b)
+        if dist is not None:
+            out[euler] = dist
+    for idx in np.flatnonzero(np.isnan(out)):
+        out[idx] = _distri_point(z_arr[idx], theta, phi, alpha, b, memo)
+    return out
+
+
+def _evaluate(block, z_val, theta, phi, alpha, b):
+    """Applies a block evaluator to a number or an array of z, in blocks of\
+    CURVE_BLOCK neighbouring values."""
+    z_arr = np.asarray(z_val, dtype=float)
+    flat = z_arr.ravel()
+    out = np.empty(flat.shape)
+    order = np.argsort(flat, kind='stable')
+    memo = {}
+    for start in range(0, len(flat), CURVE_BLOCK):
+        idx = order[start:start + CURVE_BLOCK]
+        out[idx] = block(flat[idx], theta, phi, alpha, b, memo)
+    out = out.reshape(z_arr.shape)
+    return out if out.ndim else float(out)
+
+
+def _unit_quad(theta, phi, alpha, b):
+    """P(X <= Y) by quadrature, doubling the panels until rules of two\
+    orders agree within UNIT_QUAD_TOL (or UNIT_PANELS are reached)."""
+    panels = PANELS
+    while True:
+        fine = distri_quad(1., theta, phi, alpha, b, 2 * ORDER, panels)
+        if (panels >= UNIT_PANELS or
+                abs(distri_quad(1., theta, phi, alpha, b, ORDER, panels) - fine) <=
+                UNIT_QUAD_TOL):
+            return fine
+        panels *= 2
+
+
+def distri_unit(theta, phi, alpha, b):
+    """Calculates P(X <= Y) for X ~ B(theta, phi) and Y ~ B(alpha, b), the\
+    distribution of the ratio X / Y at the switch point z = 1.
+
+    Parameters
+    ==========
+
+    theta, phi : Parameters of the beta distribution in the numerator
+    alpha, b : Parameters of the beta distribution in the denominator
+
+    Returns
+    =======
+
+    The probability as a float
+
+    See Also
+    =======
+
+    distri_series : Distribution for 0 <= z <= 1
+
+    Examples
+    ========
+
+    >>> distri_unit(56, 310, 126, 228)
+    0.9999999998...
+
+    """
+    if theta < alpha:
+        # The series below converges faster for the larger of theta and alpha
+        return 1 - distri_unit(alpha, b, theta, phi)
+    big_c = alpha + theta + b
+    # Thomae: the 3F2(1 - phi, alpha + theta, theta; alpha + theta + b,
+    # theta + 1; 1) of distri_frac equals a multiple of
+    # 3F2(alpha + b, 1, b + phi; b + 1, alpha + theta + b + phi; 1)
+    log_ratio = lambda n: (np.log(alpha + b + n) + np.log(b + phi + n) -
+                           np.log(b + 1 + n) - np.log(big_c + phi + n))
+    log_sum = last = 0.
+    start = 0
+    while start < UNIT_TERMS:
+        block = last + np.cumsum(log_ratio(np.arange(start, start + BLOCK,
+                                                     dtype=float)))
+        last = block[-1]
+        start += BLOCK
+        log_sum = np.logaddexp(log_sum, _logsumexp(block))
+        # Terms fall off like n^-(theta + 1), so the tail is about t_N N / theta
+        if last + np.log(start / theta) < log_sum + LOG_TOL:
+            break
+    else:
+        # Only past n >> b + phi do the terms fall off like that, which with
+        # small theta and large b + phi is far beyond UNIT_TERMS
+        return _unit_quad(theta, phi, alpha, b)
+    return float(np.exp(_log_norm(theta, phi, alpha, b) + gammaln(big_c) +
+                        gammaln(b + phi) - gammaln(b + 1) -
+                        gammaln(big_c + phi) + log_sum))
+
+
+def densi_series(z_val, theta, phi, alpha, b):
+    """Calculates the density of a ratio X / Y of beta distributions,\
+    X ~ B(theta, phi) and Y ~ B(alpha, b), for 0 <= z <= 1.
+
+    This is the numerical value of the z <= 1 branch of densi_frac,
+    B(alpha + theta, b) / (B(alpha, b) B(theta, phi)) z^(theta - 1)
+    2F1(alpha + theta, 1 - phi; alpha + theta + b; z).
+
+    Parameters
+    ==========
+
+    z_val : Number or array of ratio values between 0 and 1
+    theta, phi : Parameters of the beta distribution in the numerator
+    alpha, b : Parameters of the beta distribution in the denominator
+
+    Returns
+    =======
+
+    The density as a float, or an array shaped like z_val
+
+    See Also
+    =======
+
+    distri_series : Distribution for 0 <= z <= 1
+
+    Examples
+    ========
+
+    >>> densi_series(0.43, 56, 310, 126, 228)
+    6.5123813...
+
+    """
+    integer = _integer_coefs(theta, phi, alpha, b)
+    if integer is not None:
+        log_const, densi_coefs = integer[:2]
+        at_zero = np.exp(log_const) if theta == 1 else (0. if theta > 1 else np.inf)
+        return _integer_evaluate(z_val, theta, log_const, densi_coefs, theta - 1, at_zero)
+    return _evaluate(_densi_block, z_val, theta, phi, alpha, b)
+
+
+def distri_series(z_val, theta, phi, alpha, b):
+    """Calculates the distribution of a ratio X / Y of beta distributions,\
+    X ~ B(theta, phi) and Y ~ B(alpha, b), for 0 <= z <= 1.
+
+    This is the numerical value of the z <= 1 branch of distri_frac,
+    B(alpha + theta, b) / (B(alpha, b) B(theta, phi)) z^theta / theta
+    3F2(1 - phi, alpha + theta, theta; alpha + theta + b, theta + 1; z).
+
+    Parameters
+    ==========
+
+    z_val : Number or array of ratio values between 0 and 1
+    theta, phi : Parameters of the beta distribution in the numerator
+    alpha, b : Parameters of the beta distribution in the denominator
+
+    Returns
+    =======
+
+    The distribution as a float, or an array shaped like z_val
+
+    See Also
+    =======
+
+    densi_series : Density for 0 <= z <= 1
+    distri_unit : Distribution at z = 1
+
+    Examples
+    ========
+
+    >>> distri_series(0.43, 56, 310, 126, 228)
+    0.5089553...
+
+    """
+    integer = _integer_coefs(theta, phi, alpha, b)
+    if integer is not None:
+        log_const, distri_coefs = integer[0], integer[2]
+        return _integer_evaluate(z_val, theta, log_const, distri_coefs, theta, 0.)
+    return _evaluate(_distri_block, z_val, theta, phi, alpha, b)
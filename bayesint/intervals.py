@@ -6,24 +6,339 @@
 Allows for the calculation of the equal-tailed quantile credible interval
 (eqt_int_frac) and the highest posterior density interval (hpd_int_frac) of a
 ratio of two independent beta distributions. Both can be evaluated (frac_ints).
+Results can also be given as IntervalResult objects, and a batch of tables
+can be evaluated straight into a NumPy structured array (interval_batch).
+Many tables sharing the second group can be compared with that reference
+group at once (reference_intervals).
+
+With ans="estim" the intervals are found with the kernels of kernels.py,
+which are built (or loaded from an artifact) once per process and shared by
+every table. With ans="numeric" both intervals are found from the numerical
+distribution alone, without SymPy, lambdify or any state shared between calls,
+so they can be called from many threads at once.
 
 """
 
 #from builtins import *
-from sympy import solveset, symbols, S, nsolve, Abs, lambdify
-from sympy.abc import alpha, b, phi, theta, z, P, C, M, N, u, l, sigma
+from sympy import solveset, symbols, S, sympify
+from sympy.abc import alpha, b, phi, theta, z, P, C, M, N
+from mpmath import findroot, mpf
 from scipy.optimize import minimize
 import numpy as np
 from numpy import vectorize
 
 from .table_measures import rel_risk, odds_rat
-from .random_variables import densi_frac, distri_frac
+from .random_variables import (distri_frac, TOL, _beta_params, _distri_function,
+                               _ratio_spread)
+from .quadrature import REFERENCE_PANELS, distri_reference, reference_rule, _tail_quantile
+from .kernels import get_kernel
+from .results import IntervalResult, RESULT_DTYPE
 
 PI_1, PI_2, PI_3, PI_4 = symbols('pi:4')
 
+# Absolute and relative tolerance of the numerical interval bounds
+XTOL = 1e-12
+# Number of ratios the numerical distribution is first evaluated at
+GRID_SIZE = 129
+# Width of that grid, in coefficients of variation either side of the centre
+GRID_WIDTH = 10.
+# Largest number of steps of the root finding, and of rounds of the highest
+# posterior density search
+MAX_STEPS = 100
+# Number of lower tails tried at once in each round of that search
+HPD_SECTIONS = 8
+# Relative step of the slopes of the log density at the equal-tailed bounds,
+# from which that search is started, the width of its first round either
+# side of the tail estimated from them, in lengths of the Newton step, and
+# the decades its first round spans when that estimate is out of the bracket
+SEED_STEP = 1e-3
+SEED_WIDTH = 0.2
+SEED_DECADES = 4
+# Largest width of a panel of a shared rule of Y, in spreads of the integrand
+REFERENCE_RESOLUTION = 10.
+# Errors of a single table that cannot be fitted: counts the priors do not
+# fit, SymPy comparing an undefined ratio, and failed root finding
+FIT_ERRORS = (ValueError, TypeError, ArithmeticError)
+
+
+def _check_result_type(result_type):
+    """Checks the result_type option of the interval functions."""
+    if result_type not in ('tuple', 'object'):
+        raise ValueError('result_type must be "tuple" or "object"')
+
+
 ## Credible intervals for fractions
+## Numerical intervals
+def _reference_panels(theta_val, phi_val, alpha_val, b_val):
+    """Number of panels of the shared rule of Y expected to resolve X / Y.
+
+    The integrand changes over the spread of Y and, next to the bounds, over
+    that of X / z at the mean of Y; each panel is given at most
+    REFERENCE_RESOLUTION times the narrower of the two.
+    """
+    mean_y = alpha_val / (alpha_val + b_val)
+    spread = min(np.sqrt(mean_y * (1 - mean_y) / (alpha_val + b_val + 1)),
+                 mean_y * np.sqrt(phi_val / (theta_val * (theta_val + phi_val + 1))))
+    width = 1 - _tail_quantile(alpha_val, b_val) - _tail_quantile(b_val, alpha_val)
+    return 2 ** max(int(np.ceil(np.log2(width / (REFERENCE_RESOLUTION * spread)))), 0)
+
+
+def _numeric_setup(p_val, c_val, m_val, n_val, pri_val, frac_type):
+    """Ratio estimate as a float, the parameters theta, phi, alpha and b of\
+    X and Y, and a grid of ratios around the centre."""
+    if frac_type == 'odds':
+        raise NotImplementedError('numerical intervals of odds ratio not currently implemented')
+    alpha_val, b_val, theta_val, phi_val = (
+        float(val) for val in _beta_params(p_val, c_val, m_val, n_val, pri_val))
+    if c_val * m_val == 0:
+        raise ValueError('Relative risk is undefined')
+    frac = p_val * n_val / float(c_val * m_val)
+    ratio, spread = _ratio_spread(theta_val, phi_val, alpha_val, b_val)
+    z_grid = ratio * np.exp(spread * np.linspace(-GRID_WIDTH, GRID_WIDTH, GRID_SIZE))
+    return frac, (theta_val, phi_val, alpha_val, b_val), z_grid
+
+
+def _numeric_search(search, p_val, c_val, m_val, n_val, pri_val, frac_type, rules=None):
+    """Ratio estimate followed by the result of search(distri, z_grid, f_grid),\
+    whose first two items are the bounds found, for the numerical distribution.
+
+    With rules, which map numbers of panels to shared rules of Y and are
+    filled as each is first needed (so every comparison with one reference
+    shares them), the distribution first comes from the rule of
+    _reference_panels. That rule is checked where it matters, at the bounds
+    found, against the rule of twice as many panels; where they differ by
+    more than TOL the search is run again with the finer rule, and past
+    REFERENCE_PANELS panels with the distribution of the table alone.
+    """
+    frac, params, z_grid = _numeric_setup(p_val, c_val, m_val, n_val, pri_val, frac_type)
+    theta_val, phi_val, alpha_val, b_val = params
+
+    def shared(panels):
+        if panels not in rules:
+            rules[panels] = reference_rule(alpha_val, b_val, panels=panels)
+        rule = rules[panels]
+        return lambda z_val: distri_reference(z_val, theta_val, phi_val, rule)
+
+    panels = REFERENCE_PANELS
+    if rules is not None:
+        panels = _reference_panels(*params)
+    while panels < REFERENCE_PANELS:
+        distri = shared(panels)
+        result = search(distri, z_grid, np.maximum.accumulate(distri(z_grid)))
+        bounds = np.array([bound for bound in result[:2] if 0 < bound < np.inf])
+        if np.all(np.abs(distri(bounds) - shared(2 * panels)(bounds)) <= TOL):
+            return (frac,) + tuple(result)
+        panels *= 2
+    distri = _distri_function(*params)
+    return (frac,) + tuple(search(distri, z_grid, np.maximum.accumulate(distri(z_grid))))
+
+
+def _quantiles(probs, distri, z_grid, f_grid):
+    """Ratios at which the distribution reaches each of probs, all found at\
+    once by the Illinois method within brackets taken from the grid.
+
+    Each step evaluates the distribution once, at the estimates of every
+    quantile not yet found, so the work runs in a few NumPy calls on large
+    arrays, which release the GIL, rather than one small call per quantile.
+    """
+    probs = np.asarray(probs, dtype=float)
+    out = np.where(probs <= 0, 0., np.inf)
+    todo = np.flatnonzero((probs > 0) & (probs < 1))
+    prob = probs[todo]
+    idx = np.searchsorted(f_grid, prob)
+    inside = np.minimum(idx, len(z_grid) - 1)
+    lower = np.where(idx > 0, z_grid[inside - 1], 0.)
+    g_low = np.where(idx > 0, f_grid[inside - 1], 0.) - prob
+    upper = z_grid[inside]
+    g_upp = f_grid[inside] - prob
+    # Beyond the grid the bracket is doubled until it holds prob
+    grow = np.flatnonzero(idx == len(z_grid))
+    while len(grow):
+        lower[grow], g_low[grow] = upper[grow], g_upp[grow]
+        upper[grow] *= 2
+        g_upp[grow] = distri(upper[grow]) - prob[grow]
+        grow = grow[g_upp[grow] < 0]
+    z_val = upper.copy()
+    # Side of the bracket each estimate last replaced, -1 lower and 1 upper
+    side = np.zeros(len(prob), dtype=int)
+    active = np.flatnonzero(g_upp > 0)
+    for _ in range(MAX_STEPS):
+        if not len(active):
+            break
+        z_new = upper[active] - g_upp[active] * ((upper[active] - lower[active]) /
+                                                 (g_upp[active] - g_low[active]))
+        g_new = distri(z_new) - prob[active]
+        z_val[active] = z_new
+        above = g_new > 0
+        # The end kept twice in a row has its value halved (Illinois)
+        g_low[active[above & (side[active] == 1)]] /= 2
+        g_upp[active[~above & (side[active] == -1)]] /= 2
+        hit = active[above]
+        upper[hit], g_upp[hit], side[hit] = z_new[above], g_new[above], 1
+        hit = active[~above]
+        lower[hit], g_low[hit], side[hit] = z_new[~above], g_new[~above], -1
+        done = ((g_new == 0) |
+                (upper[active] - lower[active] <= XTOL + XTOL * np.abs(z_new)))
+        active = active[~done]
+    out[todo] = z_val
+    return out
+
+
+def _densities(z_val, distri):
+    """Density at positive finite ratios, from central differences of the\
+    distribution."""
+    steps = np.array([-1., 1.]) * np.sqrt(XTOL)
+    dist = distri(np.ravel(z_val)[:, None] * (1 + steps)).reshape(-1, 2)
+    return (dist[:, 1] - dist[:, 0]) / (2 * steps[1] * np.ravel(z_val))
+
+
+def _numeric_eqt(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, rules=None):
+    """Equal-tailed interval from the numerical distribution."""
+    search = lambda distri, z_grid, f_grid: _quantiles(
+        [signif / 2, 1 - signif / 2], distri, z_grid, f_grid).tolist()
+    return _numeric_search(search, p_val, c_val, m_val, n_val, pri_val, frac_type, rules)
+
+
+def _add_to_grid(z_grid, f_grid, z_val, f_val):
+    """Grid of ratios and distribution with the points z_val, f_val added."""
+    order = np.argsort(np.concatenate((z_grid, z_val)), kind='mergesort')
+    z_grid = np.concatenate((z_grid, z_val))[order]
+    return z_grid, np.maximum.accumulate(np.concatenate((f_grid, f_val))[order])
+
+
+def _hpd_search(distri, z_grid, f_grid, signif, prob_bounds, seed=None):
+    """Shortest interval holding 1 - signif of the distribution, with its lower\
+    tail searched for between prob_bounds, and the search diagnostics.
+
+    The width Q(p + 1 - signif) - Q(p) changes with the lower tail p at the
+    rate 1 / f(Q(p + 1 - signif)) - 1 / f(Q(p)), so for a unimodal density the
+    shortest interval is where log f(Q(p)) - log f(Q(p + 1 - signif)) changes
+    sign, which it does once, from negative to positive. Each round tries
+    HPD_SECTIONS lower tails across the bracket of that change at once, and
+    the next round looks around the change interpolated between the two
+    tails either side of it. The bounds found are added to the grid, so the
+    quantiles of later rounds start from narrow brackets.
+
+    A seed (tail, balance, estimate) gives the balance already known at the
+    end tail of prob_bounds and an estimate of the lower tail the first round
+    is placed around, or None when it falls outside prob_bounds. Later rounds
+    then look no further from each interpolated change than twice the step
+    from the one before.
+    """
+    low_tail, upp_tail = (float(val) for val in prob_bounds)
+    # Sign balance at the ends of the bracket, NaN where not evaluated
+    g_low = g_upp = np.nan
+    tails = np.linspace(low_tail, upp_tail, HPD_SECTIONS + 2)[1:-1]
+    estimate = None
+    if seed is not None:
+        tail, balance, estimate = seed
+        if tail == low_tail:
+            g_low = balance
+        else:
+            g_upp = balance
+        if estimate is not None:
+            half = abs(estimate - tail) * SEED_WIDTH
+            tails = np.linspace(max(estimate - half, low_tail), min(estimate + half, upp_tail),
+                                HPD_SECTIONS + 2)[1:-1]
+        else:
+            # The shortest interval is far from the known end, so the first
+            # round is spread over decades towards the other one
+            far = low_tail if tail == upp_tail else upp_tail
+            tails = np.sort(far + (tail - far) * np.logspace(-SEED_DECADES, 0,
+                                                             HPD_SECTIONS + 1)[:-1])
+    xatol = XTOL * max(signif, XTOL)
+    nit = nfev = 0
+    while upp_tail - low_tail > xatol and nit < MAX_STEPS:
+        probs = np.concatenate((tails, tails + 1 - signif))
+        bounds = _quantiles(probs, distri, z_grid, f_grid)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            densi = np.log(_densities(bounds, distri))
+        balance = densi[:len(tails)] - densi[len(tails):]
+        z_grid, f_grid = _add_to_grid(z_grid, f_grid, bounds, probs)
+        nit += 1
+        nfev += len(tails)
+        below = balance < 0
+        if np.any(below):
+            low_tail, g_low = tails[below][-1], balance[below][-1]
+        if not np.all(below):
+            upp_tail, g_upp = tails[~below][0], balance[~below][0]
+        if np.isfinite(g_low) and np.isfinite(g_upp):
+            centre = low_tail - g_low * (upp_tail - low_tail) / (g_upp - g_low)
+            half = (upp_tail - low_tail) / HPD_SECTIONS
+            if estimate is not None:
+                half = min(half, max(2 * abs(centre - estimate), xatol))
+            estimate = centre
+            tails = np.linspace(max(centre - half, low_tail), min(centre + half, upp_tail),
+                                HPD_SECTIONS + 2)[1:-1]
+        else:
+            # The change is next to an end of prob_bounds, or the density is
+            # lost in the far tails, so the bracket is only cut up
+            tails = np.linspace(low_tail, upp_tail, HPD_SECTIONS + 2)[1:-1]
+    if np.isfinite(g_low) and np.isfinite(g_upp):
+        tail = low_tail - g_low * (upp_tail - low_tail) / (g_upp - g_low)
+    else:
+        tail = (low_tail + upp_tail) / 2
+    lower, upper = _quantiles([tail, tail + 1 - signif], distri, z_grid, f_grid).tolist()
+    return lower, upper, {'fun': float(upper - lower),
+                          'nit': nit,
+                          'nfev': nfev,
+                          'message': ('Solution found.' if nit < MAX_STEPS else
+                                      'Maximum number of rounds reached.')}
+
+
+def _numeric_hpd(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, rules=None):
+    """Highest posterior density interval from the numerical distribution.
+
+    Of the intervals (Q(p), Q(p + 1 - signif)) holding 1 - signif of the
+    distribution, the highest posterior density one of a unimodal density is
+    the shortest, which _hpd_search finds over the lower tail p.
+    """
+    search = lambda distri, z_grid, f_grid: _hpd_search(distri, z_grid, f_grid, signif,
+                                                        (0, signif))
+    return _numeric_search(search, p_val, c_val, m_val, n_val, pri_val, frac_type, rules)
+
+
+def _numeric_ints(p_val, c_val, m_val, n_val, pri_val, frac_type, signif):
+    """Equal-tailed and highest posterior density intervals from one\
+    numerical distribution.
+
+    The width Q(p + 1 - signif) - Q(p) changes with p at the rate
+    1 / f(Q(p + 1 - signif)) - 1 / f(Q(p)), so at the equal-tailed p = signif / 2
+    the density f at the two equal-tailed bounds tells which half of (0, signif)
+    holds the shortest interval, and only that half is searched. The slopes of
+    log f there give a Newton step towards the shortest interval, which the
+    search starts from, and the equal-tailed bounds are added to its grid.
+    """
+    frac, params, z_grid = _numeric_setup(p_val, c_val, m_val, n_val, pri_val, frac_type)
+    distri = _distri_function(*params)
+    f_grid = np.maximum.accumulate(distri(z_grid))
+    lower, upper = _quantiles([signif / 2, 1 - signif / 2], distri, z_grid, f_grid).tolist()
+    if not 0 < lower < upper < np.inf:
+        # No interior equal-tailed interval (signif of 0 or 1) to bracket with
+        return (frac, lower, upper), (frac,) + _hpd_search(distri, z_grid, f_grid, signif,
+                                                           (0, signif))
+    bounds = np.array([lower, upper])
+    z_grid, f_grid = _add_to_grid(z_grid, f_grid, bounds, [signif / 2, 1 - signif / 2])
+    steps = np.array([-1., 0., 1.]) * SEED_STEP
+    with np.errstate(divide='ignore', invalid='ignore'):
+        densi = _densities(bounds[:, None] * (1 + steps), distri).reshape(2, 3)
+        log_densi = np.log(densi)
+        balance = log_densi[0, 1] - log_densi[1, 1]
+        # Newton step for the tail, with the slope of the balance in p made of
+        # the slopes of log f at the bounds over the density there
+        rates = (log_densi[:, 2] - log_densi[:, 0]) / (2 * SEED_STEP * bounds * densi[:, 1])
+        estimate = signif / 2 - balance / (rates[0] - rates[1])
+    prob_bounds = (0, signif / 2) if balance >= 0 else (signif / 2, signif)
+    if not prob_bounds[0] < estimate < prob_bounds[1]:
+        estimate = None
+    return (frac, lower, upper), (frac,) + _hpd_search(distri, z_grid, f_grid, signif,
+                                                       prob_bounds,
+                                                       (signif / 2, balance, estimate))
+
+
 ### Equal-tailed interval
-def eqt_int_frac(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, ans):
+def eqt_int_frac(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, ans,
+                 result_type='tuple'):
     """Calculates the Bayesian credible interval using the equal-tailed approach.
 
     Parameters
@@ -38,13 +353,16 @@ def eqt_int_frac(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, ans):
                 given in the order: pi_1, pi_2, pi_3, pi_4
     frac_type : Desired ratio - relative risk ("risk") or odds ratio ("odds")
     signif : Significance cut off desired
-    ans : Desired results - estimated ("estim") or exact "exact")
+    ans : Desired results - estimated ("estim"), exact "exact") or found\
+            from the numerical distribution ("numeric")
+    result_type : Desired result - SymPy tuple ("tuple") or IntervalResult\
+                    of floats ("object"), the latter not with "exact"
 
     Returns
     =======
 
     A tuple with the ratio, and lower and upper values of the interval\
-        of the ratio (in that order)
+        of the ratio (in that order), or the matching IntervalResult
 
     Raises
     ======
@@ -54,7 +372,11 @@ def eqt_int_frac(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, ans):
     ValueError
         Significance level must be between 0 and 1
         frac_type must be "risk" or "odds"
-        ans must be "estim" or "exact"
+        ans must be "estim", "exact" or "numeric"
+        result_type must be "tuple" or "object"
+        result_type "object" needs ans "estim" or "numeric"
+    NotImplementedError
+        numerical intervals of odds ratio not currently implemented
 
     See Also
     =======
@@ -79,38 +401,48 @@ def eqt_int_frac(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, ans):
         frac = odds_rat(p_val, c_val, m_val, n_val)
     else:
         raise ValueError('frac_type must be "risk" or "odds"')
+    _check_result_type(result_type)
+    if result_type == 'object' and ans == 'exact':
+        raise ValueError('result_type "object" needs ans "estim" or "numeric"')
+    if ans == 'numeric':
+        result = _numeric_eqt(p_val, c_val, m_val, n_val, pri_val, frac_type, signif)
+        return IntervalResult(*result) if result_type == 'object' else result
+    elif ans == 'estim':
+        _beta_params(p_val, c_val, m_val, n_val, pri_val)
+        if frac_type == 'odds':
+            raise NotImplementedError('distribution of odds ratio not currently implemented')
+        distri = get_kernel('distri_risk')
+        table = (p_val, c_val, m_val, n_val) + tuple(pri_val)
+        start = mpf(frac.p) / frac.q
+        low = sympify(findroot(lambda z_val: distri(z_val, *table) - signif / 2,
+                               start, tol=10**(900)))
+        upp = sympify(findroot(lambda z_val: distri(z_val, *table) - (1 - signif / 2),
+                               start, tol=10**(900)))
+        if result_type == 'object':
+            return IntervalResult(frac, low, upp)
+        return frac, low, upp
+    elif ans != 'exact':
+        raise ValueError('ans must be "estim", "exact" or "numeric"')
     dis = distri_frac(p_val, c_val, m_val, n_val, pri_val, frac_type)
     dis = dis.subs({alpha: C + PI_1, b: N - C + PI_2,
                     theta: P + PI_3, phi: M - P + PI_4})
     low_temp = dis - (signif / 2)
     upp_temp = dis - (1 - (signif / 2))
-    if ans == 'exact':
-        low_ext = solveset(low_temp, z, domain=S.Reals)
-        upp_ext = solveset(upp_temp, z, domain=S.Reals)
-        # Insert values from contingency table
-        low = low_ext.subs({P: p_val, C: c_val, M: m_val, N: n_val,
-                            PI_1: pri_val[0], PI_2: pri_val[1],
-                            PI_3: pri_val[2], PI_4: pri_val[3]})
-        upp = upp_ext.subs({P: p_val, C: c_val, M: m_val, N: n_val,
-                            PI_1: pri_val[0], PI_2: pri_val[1],
-                            PI_3: pri_val[2], PI_4: pri_val[3]})
-        return frac, low, upp
-    elif ans == 'estim':
-        low_est = low_temp.subs({P: p_val, C: c_val, M: m_val, N: n_val,
-                                 PI_1: pri_val[0], PI_2: pri_val[1],
-                                 PI_3: pri_val[2], PI_4: pri_val[3]})
-        low = nsolve(low_est, frac, tol=10**(900))
-        upp_est = upp_temp.subs({P: p_val, C: c_val, M: m_val, N: n_val,
-                                 PI_1: pri_val[0], PI_2: pri_val[1],
-                                 PI_3: pri_val[2], PI_4: pri_val[3]})
-        upp = nsolve(upp_est, frac, tol=10**(900))
-        return frac, low, upp
-    else:
-        raise ValueError('ans must be "estim" or "exact"')
+    low_ext = solveset(low_temp, z, domain=S.Reals)
+    upp_ext = solveset(upp_temp, z, domain=S.Reals)
+    # Insert values from contingency table
+    low = low_ext.subs({P: p_val, C: c_val, M: m_val, N: n_val,
+                        PI_1: pri_val[0], PI_2: pri_val[1],
+                        PI_3: pri_val[2], PI_4: pri_val[3]})
+    upp = upp_ext.subs({P: p_val, C: c_val, M: m_val, N: n_val,
+                        PI_1: pri_val[0], PI_2: pri_val[1],
+                        PI_3: pri_val[2], PI_4: pri_val[3]})
+    return frac, low, upp
 
 
 ### Highest posterior density interval
-def hpd_int_frac(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, minimisation_start):
+def hpd_int_frac(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, minimisation_start,
+                 result_type='tuple', ans='estim'):
     """Calculates the Bayesian credible interval using the highest posterior density approach.
 
     Parameters
@@ -127,12 +459,17 @@ def hpd_int_frac(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, minimis
     signif : Significance cut off desired - default is 0.05
     minimisation_start : starting points for minimisation (i.e. starting estimates\
                                         of lower and  upper interval points)
+    result_type : Desired result - SymPy tuple ("tuple") or IntervalResult\
+                    of floats with the minimisation diagnostics ("object")
+    ans : Desired results - estimated from the symbolic density ("estim") or\
+            found from the numerical distribution ("numeric"), in which case\
+            minimisation_start is not used
 
     Returns
     =======
 
     A tuple with the ratio, and lower and upper values of the interval\
-        of the ratio (in that order)
+        of the ratio (in that order), or the matching IntervalResult
 
     Raises
     ======
@@ -142,7 +479,10 @@ def hpd_int_frac(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, minimis
     ValueError
         Significance level must be between 0 and 1
         frac_type must be "risk" or "odds"
-        ans must be "estim" or "exact"
+        ans must be "estim" or "numeric"
+        result_type must be "tuple" or "object"
+    NotImplementedError
+        numerical intervals of odds ratio not currently implemented
 
     See Also
     =======
@@ -167,35 +507,24 @@ def hpd_int_frac(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, minimis
         frac = odds_rat(p_val, c_val, m_val, n_val)
     else:
         raise ValueError('frac_type must be "risk" or "odds"')
+    _check_result_type(result_type)
+    if ans == 'numeric':
+        result = _numeric_hpd(p_val, c_val, m_val, n_val, pri_val, frac_type, signif)
+        return IntervalResult(*result) if result_type == 'object' else result[:3]
+    elif ans != 'estim':
+        raise ValueError('ans must be "estim" or "numeric"')
 
     if minimisation_start is None:
         minimisation_start = (max(0, frac - 0.2), frac + 0.2)
 
-    dens = densi_frac(p_val, c_val, m_val, n_val, pri_val, frac_type)
-    dis = distri_frac(p_val, c_val, m_val, n_val, pri_val, frac_type)
-    #Generate the density and distribution at the upper and lower confidence values
-    dens_lower = dens.subs({z: l})
-    dens_upper = dens.subs({z: u})
-    dis_lower = dis.subs({z: l})
-    dis_upper = dis.subs({z: u})
-
-    #Generate the interval function
-    interval = Abs(dens_upper - dens_lower) + Abs(dis_upper - dis_lower - (1 - sigma))
-    #Generate the concrete interval function for these parameter values
-    interval_concrete = interval.subs({PI_1: pri_val[0],
-                                       PI_2: pri_val[1],
-                                       PI_3: pri_val[2],
-                                       PI_4: pri_val[3],
-                                       P: p_val,
-                                       C: c_val,
-                                       M: m_val,
-                                       N: n_val,
-                                       sigma: signif})
-
-    #Convert to a function
-    #print interval_concrete
-    interval_fn = vectorize(lambdify((l, u), interval_concrete, modules="mpmath"))
-    #print interval_fn(0,1)
+    _beta_params(p_val, c_val, m_val, n_val, pri_val)
+    if frac_type == 'odds':
+        raise NotImplementedError('distribution of odds ratio not currently implemented')
+    #The interval function, |f(u) - f(l)| + |F(u) - F(l) - (1 - sigma)|, of
+    #the density f and distribution F for these parameter values
+    interval = get_kernel('hpd_risk')
+    table = (p_val, c_val, m_val, n_val) + tuple(pri_val)
+    interval_fn = vectorize(lambda lower, upper: interval(*((lower, upper) + table + (signif,))))
 
     def interval_fn_min(x0):
         """A minimisable form of the interval function
@@ -234,14 +563,26 @@ def hpd_int_frac(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, minimis
     if frac > upper:
         raise ValueError('Central estimate ({}) was higher than the upper bound ({})'
                          ''.format(frac, upper))
+    if result_type == 'object':
+        return IntervalResult(frac, lower, upper,
+                              {'fun': float(minimise_result['fun']),
+                               'nit': int(minimise_result['nit']),
+                               'nfev': int(minimise_result['nfev']),
+                               'message': str(minimise_result['message'])})
     return (frac, lower, upper)
 
 
 ### Wrapper giving both intervals
-def frac_ints(p_val, c_val, m_val, n_val, pri_val, frac_type, signif):
+def frac_ints(p_val, c_val, m_val, n_val, pri_val, frac_type, signif, int_type='both',
+              ans='numeric', result_type='tuple'):
     """Provides the results from calculating Bayesian credible intervals using\
     the equal-tailed approach and the highest posterior density approach.
 
+    With ans="numeric" the distribution is built once for both intervals, and
+    the equal-tailed bounds are used to narrow the search for the highest
+    posterior density interval, which is cheaper than calling eqt_int_frac
+    and hpd_int_frac one after the other.
+
     Parameters
     ==========
 
@@ -255,11 +596,15 @@ def frac_ints(p_val, c_val, m_val, n_val, pri_val, frac_type, signif):
     frac_type : Desired ratio - relative risk ("risk") or odds ratio ("odds")
     signif : Significance cut off desired
     int_type : Desired interval type - highest posterior density ("hpd"), equal-tailed ("equal") or ("both")
+    ans : Desired results - found from the numerical distribution ("numeric")\
+            or estimated from the symbolic distribution ("estim")
+    result_type : Desired result - tuple ("tuple") or IntervalResult\
+                    of floats ("object")
 
     Returns
     =======
 
-    A tuple with the two intervals
+    A tuple with the two intervals, or the one interval asked for
 
     Raises
     ======
@@ -267,7 +612,12 @@ def frac_ints(p_val, c_val, m_val, n_val, pri_val, frac_type, signif):
     TypeError
         Count inputs must be integers
     ValueError
+        Significance level must be between 0 and 1
         int_type must be "hpd" or "equal" or "both"
+        ans must be "estim" or "numeric"
+        result_type must be "tuple" or "object"
+    NotImplementedError
+        numerical intervals of odds ratio not currently implemented
 
     See Also
     =======
@@ -276,25 +626,215 @@ def frac_ints(p_val, c_val, m_val, n_val, pri_val, frac_type, signif):
     hpd_int_frac : Highest posterior density interval
 
     Examples
+    ========
 
     >>> frac_ints(56, 126, 366, 354, (0, 0, 0, 0), "risk", 0.05, "both")
-    ((236/549, 0.184135819539239, 0.667343920284484),
-    (236/549, 0.18274558146543513, 0.84884394841446875))
+    ((0.42987249544626593, 0.3212470546315804, 0.562634405119741),
+    (0.42987249544626593, 0.31513234658115824, 0.5549855189293781))
 
     """
     if not (isinstance(p_val, int) and isinstance(c_val, int) and
             isinstance(m_val, int) and isinstance(n_val, int)):
         raise TypeError('Count inputs must be integers')
-    args = (p_val, c_val, m_val, n_val, pri_val, frac_type, signif, int_type)
-    
-    if int_type == 'both':
-        return eqt_int_frac(*args, ans="estim"), hpd_int_frac(*args, minimisation_start=None)
-        
-    elif int_type == 'equal':
-        return eqt_int_frac(*args, ans="estim")
-        
+    if not 0 <= signif <= 1:
+        raise ValueError('Significance level must be between 0 and 1')
+    if int_type not in ('both', 'equal', 'hpd'):
+        raise ValueError('int_type must be "hpd" or "equal" or "both"')
+    if ans not in ('estim', 'numeric'):
+        raise ValueError('ans must be "estim" or "numeric"')
+    _check_result_type(result_type)
+    args = (p_val, c_val, m_val, n_val, pri_val, frac_type, signif)
+
+    if int_type == 'equal':
+        return eqt_int_frac(*args, ans=ans, result_type=result_type)
+
     elif int_type == 'hpd':
-        return hpd_int_frac(*args, minimisation_start=None)
-    
+        return hpd_int_frac(*args, minimisation_start=None, result_type=result_type,
+                            ans=ans)
+
+    elif ans == 'estim':
+        return (eqt_int_frac(*args, ans=ans, result_type=result_type),
+                hpd_int_frac(*args, minimisation_start=None, result_type=result_type))
+
+    if frac_type not in ('risk', 'odds'):
+        raise ValueError('frac_type must be "risk" or "odds"')
+    eqt_result, hpd_result = _numeric_ints(*args)
+    if result_type == 'object':
+        return IntervalResult(*eqt_result), IntervalResult(*hpd_result)
+    return eqt_result, hpd_result[:3]
+
+
+### Batch of tables
+def interval_batch(tables, pri_val, frac_type, signif, int_type='equal', ans='estim',
+                   out=None):
+    """Calculates the credible intervals of many tables straight into a NumPy\
+    structured array, with no SymPy numbers kept per table.
+
+    Parameters
+    ==========
+
+    tables : Sequence or array of tables, each given as (p_val, c_val, m_val, n_val)
+    pri_val : Tuple containing belief parameters for the two beta distributions,\
+                B(c_val + pi_1, n_val - c_val + pi_2) and B(p_val + pi_3, m_val - p_val + pi_4),\
+                given in the order: pi_1, pi_2, pi_3, pi_4
+    frac_type : Desired ratio - relative risk ("risk") or odds ratio ("odds")
+    signif : Significance cut off desired
+    int_type : Desired interval type - highest posterior density ("hpd") or\
+                equal-tailed ("equal")
+    ans : Desired results - estimated from the symbolic distribution ("estim")\
+            or found from the numerical distribution ("numeric")
+    out : Optional array of RESULT_DTYPE to fill (for example a numpy.memmap),\
+            of at least len(tables) rows
+
+    Returns
+    =======
+
+    The structured array of RESULT_DTYPE, one row per table; the ratio and\
+        bounds of a table whose interval could not be calculated are NaN
+
+    Raises
+    ======
+
+    TypeError
+        Count inputs must be integers
+    ValueError
+        Significance level must be between 0 and 1
+        frac_type must be "risk" or "odds"
+        int_type must be "hpd" or "equal"
+        ans must be "estim" or "numeric"
+        out must have RESULT_DTYPE and room for every table
+    NotImplementedError
+        numerical intervals of odds ratio not currently implemented
+
+    See Also
+    =======
+
+    pack_results : Packs results that were already calculated
+
+    Examples
+    ========
+
+    >>> interval_batch([(56, 126, 366, 354)], (0, 0, 0, 0), "risk", 0.05)
+    array([(56, 126, 366, 354, 0.42987..., 0.18413..., 0.66734...)], ...)
+
+    """
+    # Checked here, as every table would fail the same way
+    if not 0 <= signif <= 1:
+        raise ValueError('Significance level must be between 0 and 1')
+    if frac_type not in ('risk', 'odds'):
+        raise ValueError('frac_type must be "risk" or "odds"')
+    if ans not in ('estim', 'numeric'):
+        raise ValueError('ans must be "estim" or "numeric"')
+    if ans == 'numeric' and frac_type == 'odds':
+        raise NotImplementedError('numerical intervals of odds ratio not currently implemented')
+    if int_type == 'equal':
+        interval = lambda table: eqt_int_frac(*table, pri_val=pri_val, frac_type=frac_type,
+                                              signif=signif, ans=ans)
+    elif int_type == 'hpd':
+        interval = lambda table: hpd_int_frac(*table, pri_val=pri_val, frac_type=frac_type,
+                                              signif=signif, minimisation_start=None, ans=ans)
     else:
-        raise ValueError('int_type must be "hpd" or "equal" or "both"')
+        raise ValueError('int_type must be "hpd" or "equal"')
+    counts = np.asarray(tables)
+    if counts.size and not np.issubdtype(counts.dtype, np.integer):
+        raise TypeError('Count inputs must be integers')
+    if out is None:
+        out = np.empty(len(counts), dtype=RESULT_DTYPE)
+    elif out.dtype != RESULT_DTYPE or len(out) < len(counts):
+        raise ValueError('out must have RESULT_DTYPE and room for every table')
+    # Plain integers, as the interval functions do not take NumPy integers
+    for row, table in enumerate(counts.tolist()):
+        try:
+            result = tuple(float(val) for val in interval(table))
+        except FIT_ERRORS:
+            # One table that cannot be fitted must not stop the batch
+            result = (np.nan, np.nan, np.nan)
+        out[row] = tuple(table) + result
+    return out[:len(counts)]
+
+
+### Many tables against one reference group
+def reference_intervals(c_val, n_val, p_vals, m_vals, pri_val, frac_type, signif,
+                        int_type='equal', out=None):
+    """Calculates the numerical credible intervals of many groups compared\
+    with one reference group, working out the reference side only once.
+
+    The ratios are of each group (p_val, m_val) to the reference group
+    (c_val, n_val). Quadrature rules over the reference beta distribution,
+    with its density at their nodes, are found once and shared by every
+    comparison. Each comparison starts from a rule whose panels are narrow
+    next to the spreads of both groups, keeps it where it agrees within TOL at
+    the bounds with the rule of twice as many panels, and falls back to the
+    distribution of ans="numeric" when none below REFERENCE_PANELS panels does.
+
+    Parameters
+    ==========
+
+    c_val : Number of exposed in the reference group
+    n_val : Total number in the reference group
+    p_vals : Sequence of numbers of exposed in the compared groups
+    m_vals : Sequence of totals in the compared groups
+    pri_val : Tuple containing belief parameters for the two beta distributions,\
+                B(c_val + pi_1, n_val - c_val + pi_2) and B(p_val + pi_3, m_val - p_val + pi_4),\
+                given in the order: pi_1, pi_2, pi_3, pi_4
+    frac_type : Desired ratio - only relative risk ("risk")
+    signif : Significance cut off desired
+    int_type : Desired interval type - highest posterior density ("hpd") or\
+                equal-tailed ("equal")
+    out : Optional array of RESULT_DTYPE to fill, of at least len(p_vals) rows
+
+    Returns
+    =======
+
+    The structured array of RESULT_DTYPE, one row per compared group
+
+    Raises
+    ======
+
+    TypeError
+        Count inputs must be integers
+    ValueError
+        p_vals and m_vals must be one dimensional and of the same length
+        Significance level must be between 0 and 1
+        int_type must be "hpd" or "equal"
+        out must have RESULT_DTYPE and room for every table
+    NotImplementedError
+        numerical intervals of odds ratio not currently implemented
+
+    See Also
+    =======
+
+    eqt_int_frac : Equal-tailed interval of one table
+    interval_batch : Intervals of unrelated tables
+
+    Examples
+    ========
+
+    >>> reference_intervals(126, 354, [56, 60], [366, 400], (0, 0, 0, 0), "risk", 0.05)
+    array([(56, 126, 366, 354, 0.42987..., 0.32124..., 0.56263...),
+           (60, 126, 400, 354, 0.42142..., 0.31745..., 0.54849...)], ...)
+
+    """
+    p_arr, m_arr = np.asarray(p_vals), np.asarray(m_vals)
+    if p_arr.ndim != 1 or p_arr.shape != m_arr.shape:
+        raise ValueError('p_vals and m_vals must be one dimensional and of the same length')
+    if p_arr.size and not (np.issubdtype(p_arr.dtype, np.integer) and
+                           np.issubdtype(m_arr.dtype, np.integer)):
+        raise TypeError('Count inputs must be integers')
+    if not 0 <= signif <= 1:
+        raise ValueError('Significance level must be between 0 and 1')
+    if int_type == 'equal':
+        interval = _numeric_eqt
+    elif int_type == 'hpd':
+        interval = lambda *args: _numeric_hpd(*args)[:3]
+    else:
+        raise ValueError('int_type must be "hpd" or "equal"')
+    if out is None:
+        out = np.empty(len(p_arr), dtype=RESULT_DTYPE)
+    elif out.dtype != RESULT_DTYPE or len(out) < len(p_arr):
+        raise ValueError('out must have RESULT_DTYPE and room for every table')
+    rules = {}
+    for row, (p_val, m_val) in enumerate(zip(p_arr.tolist(), m_arr.tolist())):
+        table = (p_val, c_val, m_val, n_val)
+        out[row] = table + interval(*(table + (pri_val, frac_type, signif, rules)))
+    return out[:len(p_arr)]
@@ -0,0 +1,236 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+"""Kernels.
+
+Allows for the prepared numerical kernels behind the interval calculations to
+be built once (build_kernels), written to a versioned artifact on disk
+(save_kernels) and read back by a new process (load_kernels), so a worker does
+not have to rebuild and lambdify the SymPy expressions of random_variables.py
+before its first result.
+
+A kernel is the mpmath code generated by lambdify from an expression in the
+table symbols P, C, M, N and pi0, ..., pi3, so one kernel serves every table.
+The artifact is a JSON file holding that code, with the constants of each
+expression already folded in by SymPy. It is only loaded by the bayesint
+version that wrote it, and only if the modules the expressions come from and
+the SymPy and mpmath versions are the same as when it was written, which
+also catches artifacts of an older checkout that is not installed.
+Run ``bayesint-kernels PATH`` to write one.
+
+Loading an artifact runs the code it holds, so only load artifacts written by
+save_kernels and kept where nobody else can change them.
+
+"""
+
+#from builtins import *
+import argparse
+import hashlib
+import inspect
+import io
+import json
+import os
+import threading
+
+import mpmath
+import sympy
+from sympy import Abs, lambdify
+from sympy.utilities.lambdify import MPMATH_TRANSLATIONS
+from sympy.abc import z, P, C, M, N, u, l, sigma
+
+from . import random_variables
+from .random_variables import densi_frac, distri_frac, PI_1, PI_2, PI_3, PI_4
+
+# Version of the layout of the artifact
+KERNEL_FORMAT = 2
+# Symbols of a table, the trailing arguments of every kernel
+TABLE_ARGS = (P, C, M, N, PI_1, PI_2, PI_3, PI_4)
+# Kernels every artifact must hold
+KERNEL_NAMES = ('distri_risk', 'hpd_risk')
+
+_KERNELS = {}
+_LOCK = threading.Lock()
+
+
+def _package_version():
+    """Version of the installed package, read once bayesint is imported."""
+    from . import __version__
+    return __version__
+
+
+def _source_digest():
+    """Digest of the modules the kernels are generated from and of the SymPy\
+    and mpmath versions generating them."""
+    digest = hashlib.sha256()
+    for module_path in (random_variables.__file__, __file__):
+        source_path = os.path.splitext(module_path)[0] + '.py'
+        with io.open(source_path if os.path.exists(source_path) else module_path,
+                     'rb') as stream:
+            digest.update(stream.read())
+    digest.update('sympy {} mpmath {}'.format(sympy.__version__,
+                                              mpmath.__version__).encode('utf8'))
+    return digest.hexdigest()
+
+
+def _expressions():
+    """Names, arguments and expressions of the kernels."""
+    # The expressions only hold the table symbols, so any valid table will do
+    dens = densi_frac(1, 1, 2, 2, (0, 0, 0, 0), 'risk')
+    dis = distri_frac(1, 1, 2, 2, (0, 0, 0, 0), 'risk')
+    interval = (Abs(dens.subs({z: u}) - dens.subs({z: l})) +
+                Abs(dis.subs({z: u}) - dis.subs({z: l}) - (1 - sigma)))
+    return {'distri_risk': ((z,) + TABLE_ARGS, dis),
+            'hpd_risk': ((l, u) + TABLE_ARGS + (sigma,), interval)}
+
+
+def _compile(source):
+    """Turns the source of one generated kernel into a function."""
+    namespace = dict(mpmath.__dict__)
+    # Names some SymPy versions print for mpmath functions, such as
+    # conjugate for conj, which lambdify would add in the same way
+    namespace.update((sympy_name, getattr(mpmath, mpmath_name))
+                     for sympy_name, mpmath_name in MPMATH_TRANSLATIONS.items()
+                     if hasattr(mpmath, mpmath_name))
+    exec(compile(source, '<bayesint kernel>', 'exec'), namespace)
+    return namespace['_lambdifygenerated']
+
+
+def build_kernels():
+    """Generates the source code of the kernels from the SymPy expressions.
+
+    Returns
+    =======
+
+    A dictionary from kernel name to a dictionary holding its argument names\
+        ("args") and source code ("source")
+
+    See Also
+    =======
+
+    save_kernels : Writes the kernels to disk
+
+    """
+    kernels = {}
+    for name, (args, expr) in _expressions().items():
+        kernel = lambdify(args, expr, modules='mpmath')
+        kernels[name] = {'args': [str(arg) for arg in args],
+                         'source': inspect.getsource(kernel)}
+    return kernels
+
+
+def save_kernels(path):
+    """Writes the kernels to a versioned artifact.
+
+    Parameters
+    ==========
+
+    path : Name of the JSON file to write
+
+    See Also
+    =======
+
+    load_kernels : Reads the artifact back
+
+    Examples
+    ========
+
+    >>> save_kernels('bayesint-kernels.json')
+
+    """
+    artifact = {'format': KERNEL_FORMAT,
+                'version': _package_version(),
+                'digest': _source_digest(),
+                'kernels': build_kernels()}
+    with io.open(path, 'wb') as stream:
+        stream.write(json.dumps(artifact, indent=1, sort_keys=True).encode('utf8'))
+
+
+def load_kernels(path):
+    """Reads an artifact written by save_kernels and makes its kernels the\
+    ones used by the interval calculations.
+
+    The artifact holds Python code, which is run to make the kernels, so only
+    load artifacts from a trusted source.
+
+    Parameters
+    ==========
+
+    path : Name of the JSON file to read
+
+    Returns
+    =======
+
+    A dictionary from kernel name to function
+
+    Raises
+    ======
+
+    ValueError
+        Kernel artifact format is not supported
+        Kernel artifact was written by another version of bayesint
+        Kernel artifact was generated from other sources or SymPy version
+        Kernel artifact is missing kernels
+
+    See Also
+    =======
+
+    save_kernels : Writes the artifact
+    get_kernel : Kernel used by the interval calculations
+
+    """
+    with io.open(path, encoding='utf8') as stream:
+        artifact = json.load(stream)
+    if artifact.get('format') != KERNEL_FORMAT:
+        raise ValueError('Kernel artifact format ({}) is not supported ({})'.format(
+            artifact.get('format'), KERNEL_FORMAT))
+    if artifact.get('version') != _package_version():
+        raise ValueError('Kernel artifact was written by bayesint {}, this is {}'.format(
+            artifact.get('version'), _package_version()))
+    if artifact.get('digest') != _source_digest():
+        raise ValueError('Kernel artifact was generated from other sources or SymPy '
+                         'version, write it again')
+    missing = set(KERNEL_NAMES) - set(artifact.get('kernels', ()))
+    if missing:
+        raise ValueError('Kernel artifact is missing kernels: {}'.format(
+            ', '.join(sorted(missing))))
+    kernels = dict((name, _compile(kernel['source']))
+                   for name, kernel in artifact['kernels'].items())
+    with _LOCK:
+        _KERNELS.clear()
+        _KERNELS.update(kernels)
+    return kernels
+
+
+def get_kernel(name):
+    """Gives the named kernel, building all kernels on first use unless an\
+    artifact was loaded.
+
+    Parameters
+    ==========
+
+    name : Name of the kernel, "distri_risk" or "hpd_risk"
+
+    Returns
+    =======
+
+    The kernel, a function of the kernel arguments returning an mpmath number
+
+    """
+    with _LOCK:
+        if not _KERNELS:
+            _KERNELS.update((kernel_name, _compile(kernel['source']))
+                            for kernel_name, kernel in build_kernels().items())
+        return _KERNELS[name]
+
+
+def main(argv=None):
+    """Command line entry point writing an artifact."""
+    parser = argparse.ArgumentParser(
+        description='Write the bayesint kernels to a versioned artifact.')
+    parser.add_argument('path', help='name of the JSON file to write')
+    options = parser.parse_args(argv)
+    save_kernels(options.path)
+
+
+if __name__ == '__main__':
+    main()
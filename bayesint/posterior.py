@@ -0,0 +1,205 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+"""Posterior.
+
+Allows for the posterior of the relative risk of one table to be kept up to
+date while counts arrive in increments (Posterior). An update adds the new
+counts and rebuilds the numerical distribution of the new table; its
+intervals are then found from those of the previous counts, on a few ratios
+around the previous bounds instead of a grid over the whole distribution,
+and the search for the highest posterior density interval starts from the
+previous one. When the counts change little, as they do between updates, an
+update so takes a small and steady number of evaluations of the distribution.
+
+"""
+
+#from builtins import *
+import numpy as np
+
+from .random_variables import _beta_params, _distri_function, _ratio_spread
+from .intervals import GRID_SIZE, GRID_WIDTH, _check_result_type, _hpd_search, _quantiles
+from .results import IntervalResult
+
+# Half width of the ratios around each previous bound, in coefficients of
+# variation
+REFRESH_WIDTH = 0.5
+# Number of ratios around each previous bound
+REFRESH_SIZE = 9
+# Half width of the lower tails searched around the previous highest
+# posterior density interval, as a fraction of the significance level
+REFRESH_TAIL = 0.125
+
+
+class Posterior(object):
+    """Posterior of the relative risk of one table, updated with new counts.
+
+    Parameters
+    ==========
+
+    p_val : Number of exposed in group one
+    c_val : Number of exposed in group two
+    m_val : Total number in group one
+    n_val : Total number in group two
+    pri_val : Tuple containing belief parameters for the two beta distributions,\
+                B(c_val + pi_1, n_val - c_val + pi_2) and B(p_val + pi_3, m_val - p_val + pi_4),\
+                given in the order: pi_1, pi_2, pi_3, pi_4
+    frac_type : Desired ratio - only relative risk ("risk")
+    signif : Significance cut off desired
+
+    Raises
+    ======
+
+    TypeError
+        Count inputs must be integers
+    ValueError
+        Significance level must be between 0 and 1
+        frac_type must be "risk" or "odds"
+        C must be larger than pi1, and as _beta_params for the other counts
+    NotImplementedError
+        numerical intervals of odds ratio not currently implemented
+
+    See Also
+    =======
+
+    eqt_int_frac : Equal-tailed interval of one table
+    hpd_int_frac : Highest posterior density interval of one table
+
+    Examples
+    ========
+
+    >>> posterior = Posterior(56, 126, 366, 354, (0, 0, 0, 0), "risk", 0.05)
+    >>> posterior.eqt_int()
+    (0.42987249544626593, 0.3212470546315804, 0.562634405119741)
+    >>> posterior.update(3, 2, 20, 15).eqt_int()
+    (0.44063714378238344, 0.3313896502463979, 0.5740647882943453)
+
+    """
+    __slots__ = ('p_val', 'c_val', 'm_val', 'n_val', 'pri_val', 'frac_type', 'signif',
+                 '_frac', '_distri', '_centre', '_grid', '_eqt', '_hpd', '_bounds', '_tail')
+
+    def __init__(self, p_val, c_val, m_val, n_val, pri_val, frac_type, signif):
+        if not 0 <= signif <= 1:
+            raise ValueError('Significance level must be between 0 and 1')
+        if frac_type == 'odds':
+            raise NotImplementedError('numerical intervals of odds ratio not currently implemented')
+        elif frac_type != 'risk':
+            raise ValueError('frac_type must be "risk" or "odds"')
+        self.pri_val = tuple(pri_val)
+        self.frac_type = frac_type
+        self.signif = signif
+        # Bounds of the last interval of each type found, and the lower tail
+        # of the last highest posterior density interval, for any counts
+        self._bounds = {}
+        self._tail = None
+        self._setup(p_val, c_val, m_val, n_val)
+
+    def _setup(self, p_val, c_val, m_val, n_val):
+        """Checks the counts and builds the distribution of the table."""
+        alpha_val, b_val, theta_val, phi_val = (
+            float(val) for val in _beta_params(p_val, c_val, m_val, n_val, self.pri_val))
+        if c_val * m_val == 0:
+            raise ValueError('Relative risk is undefined')
+        self.p_val, self.c_val, self.m_val, self.n_val = p_val, c_val, m_val, n_val
+        self._frac = p_val * n_val / float(c_val * m_val)
+        self._distri = _distri_function(theta_val, phi_val, alpha_val, b_val)
+        self._centre = _ratio_spread(theta_val, phi_val, alpha_val, b_val)
+        self._grid = self._eqt = self._hpd = None
+
+    def _ratios(self):
+        """Ratios the distribution is evaluated at to bracket the bounds:\
+        around the previous bounds, or a grid around the centre at first."""
+        if self._grid is None:
+            ratio, spread = self._centre
+            bounds = np.array([bound for pair in self._bounds.values() for bound in pair
+                               if 0 < bound < np.inf])
+            if len(bounds):
+                z_grid = np.sort(np.ravel(bounds[:, None] * np.exp(
+                    spread * np.linspace(-REFRESH_WIDTH, REFRESH_WIDTH, REFRESH_SIZE))))
+            else:
+                z_grid = ratio * np.exp(spread * np.linspace(-GRID_WIDTH, GRID_WIDTH,
+                                                             GRID_SIZE))
+            self._grid = z_grid, np.maximum.accumulate(self._distri(z_grid))
+        return self._grid
+
+    @property
+    def table(self):
+        """Current counts, as (p_val, c_val, m_val, n_val)."""
+        return self.p_val, self.c_val, self.m_val, self.n_val
+
+    def update(self, p_delta, c_delta, m_delta, n_delta):
+        """Adds new counts to the table.
+
+        Parameters
+        ==========
+
+        p_delta : Change in the number of exposed in group one
+        c_delta : Change in the number of exposed in group two
+        m_delta : Change in the total number in group one
+        n_delta : Change in the total number in group two
+
+        Returns
+        =======
+
+        The posterior itself
+
+        Raises
+        ======
+
+        TypeError
+            Count inputs must be integers
+        ValueError
+            As _beta_params for the new counts, which leaves the posterior\
+            unchanged
+
+        """
+        if not (isinstance(p_delta, int) and isinstance(c_delta, int) and
+                isinstance(m_delta, int) and isinstance(n_delta, int)):
+            raise TypeError('Count inputs must be integers')
+        self._setup(self.p_val + p_delta, self.c_val + c_delta,
+                    self.m_val + m_delta, self.n_val + n_delta)
+        return self
+
+    def eqt_int(self, result_type='tuple'):
+        """Equal-tailed interval of the current counts, as eqt_int_frac\
+        with ans="numeric"."""
+        _check_result_type(result_type)
+        if self._eqt is None:
+            z_grid, f_grid = self._ratios()
+            lower, upper = _quantiles([self.signif / 2, 1 - self.signif / 2],
+                                      self._distri, z_grid, f_grid).tolist()
+            self._eqt = (self._frac, lower, upper)
+            self._bounds['equal'] = (lower, upper)
+        return IntervalResult(*self._eqt) if result_type == 'object' else self._eqt
+
+    def hpd_int(self, result_type='tuple'):
+        """Highest posterior density interval of the current counts, as\
+        hpd_int_frac with ans="numeric"."""
+        _check_result_type(result_type)
+        if self._hpd is None:
+            z_grid, f_grid = self._ratios()
+            prob_bounds = (0, self.signif)
+            if self._tail is not None:
+                prob_bounds = (max(0, self._tail - REFRESH_TAIL * self.signif),
+                               min(self.signif, self._tail + REFRESH_TAIL * self.signif))
+            lower, upper, diagnostics = _hpd_search(self._distri, z_grid, f_grid,
+                                                    self.signif, prob_bounds)
+            tail = float(self._distri(lower))
+            edge = REFRESH_TAIL * self.signif * 1e-3
+            if prob_bounds != (0, self.signif) and not (
+                    prob_bounds[0] + edge < tail < prob_bounds[1] - edge):
+                # The shortest interval moved further than the search reached
+                lower, upper, diagnostics = _hpd_search(self._distri, z_grid, f_grid,
+                                                        self.signif, (0, self.signif))
+                tail = float(self._distri(lower))
+            self._hpd = (self._frac, lower, upper, diagnostics)
+            self._tail = tail
+            self._bounds['hpd'] = (lower, upper)
+        if result_type == 'object':
+            return IntervalResult(*self._hpd)
+        return self._hpd[:3]
+
+    def __repr__(self):
+        return 'Posterior({}, {}, {}, {}, {!r}, {!r}, {!r})'.format(
+            self.p_val, self.c_val, self.m_val, self.n_val, self.pri_val,
+            self.frac_type, self.signif)
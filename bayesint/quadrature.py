@@ -0,0 +1,348 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+"""Quadrature.
+
+Allows for the numerical evaluation of the distribution of a ratio of two
+independent beta distributions, X / Y with X ~ B(theta, phi) and
+Y ~ B(alpha, b), as a one dimensional integral (distri_quad)
+
+    P(X / Y <= z) = int_0^1 I_(min(1, z y))(theta, phi) f_Y(y) dy
+
+where I is the regularised incomplete beta function and f_Y the density of Y.
+Unlike the series of hypergeometric.py the same rule works on both sides of
+z = 1, and all values of z are integrated at once as one array.
+
+The integral is taken with composite Gauss-Legendre rules of fixed order over
+the part of the range where the integrand is not negligible: below the
+TAIL quantile of X / z and beyond the TAIL quantiles of Y it is dropped, and
+above the upper TAIL quantile of X / z (and above y = 1 / z, where I = 1) it
+is replaced by the exact tail of Y, 1 - I_y(alpha, b).
+With a parameter below SMOOTH_PARAM the integrand behaves like a power of the
+distance to y = 0, y = 1 or y = 1 / z, such as (1 - y)^(b - 1), which
+Gauss-Legendre rules converge on only slowly. Where such a point is next to
+the range and Y has some probability there, the end of the range is moved
+onto it and a tanh-sinh rule of as many nodes, which crowds them towards both
+ends, is used instead; 1 - y and 1 - z y are carried separately so that nodes
+next to y = 1 and y = 1 / z keep their distance from them. The density of Y
+is taken relative to its mean (_log_beta_pdf), which keeps it accurate to a
+few units in the last place for parameters in the tens of thousands.
+quad_error estimates the error of a rule by comparing it to one of twice the
+order.
+
+When many numerators are compared with one denominator, the nodes of Y and
+its density there only depend on Y and can be worked out once
+(reference_rule); the distribution of each ratio is then a weighted sum of
+incomplete beta functions of X alone (distri_reference).
+
+Nothing is cached between calls beyond the rules of the default orders,
+which are built once on import, and a reference rule is a plain pair of
+arrays, so these functions may be called from many
+threads at once; the work is done in NumPy and SciPy routines that release
+the GIL.
+
+"""
+
+#from builtins import *
+import numpy as np
+from scipy.special import betainc, betaincinv, gammaln
+
+# Probability left out in each tail of X and Y
+TAIL = 1e-17
+# Number of Gauss-Legendre nodes in each panel
+ORDER = 32
+# Number of panels the integration range is split into
+PANELS = 4
+# Largest number of panels of the fixed rules over the whole range of a reference Y
+REFERENCE_PANELS = 8
+# Parameters below which the integrand is not smooth next to y = 0, y = 1 or
+# y = 1 / z
+SMOOTH_PARAM = 8.
+# Distance from the integration range, as a fraction of its width, within
+# which such a point calls for a tanh-sinh rule instead of Gauss-Legendre
+ROUGH_NEAR = 0.1
+# Probability of Y that has to lie that close to such a point for it to matter
+ROUGH_MASS = 1e-9
+# Largest t of the tanh-sinh rules, whose nodes are (1 + tanh(pi / 2 sinh t)) / 2
+TANH_SINH_SPAN = 4.
+# Smallest argument of the gamma function at which Stirling's series is used
+STIRLING_MIN = 20.
+# Number of bisection steps taken to repair a TAIL quantile
+QUANTILE_STEPS = 64
+
+
+def _rule(order):
+    """Nodes and weights of the Gauss-Legendre rule on [0, 1]."""
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    return (nodes + 1) / 2, weights / 2
+
+
+def _tanh_sinh_rule(size):
+    """Nodes, their distances from 1 and weights of the tanh-sinh rule of\
+    size nodes on [0, 1], at the midpoints of equal steps in t."""
+    step = 2 * TANH_SINH_SPAN / size
+    t_val = step * (np.arange(size) - (size - 1) / 2.)
+    u_val = np.pi / 2 * np.sinh(t_val)
+    return (1 / (1 + np.exp(-2 * u_val)), 1 / (1 + np.exp(2 * u_val)),
+            step * np.pi / 4 * np.cosh(t_val) / np.cosh(u_val) ** 2)
+
+
+# Rules used by distri_quad and quad_error with the default order, read only
+_RULES = {ORDER: _rule(ORDER), 2 * ORDER: _rule(2 * ORDER)}
+_TANH_SINH_RULES = {ORDER * PANELS: _tanh_sinh_rule(ORDER * PANELS),
+                    2 * ORDER * PANELS: _tanh_sinh_rule(2 * ORDER * PANELS)}
+
+
+def _gauss_legendre(order):
+    """Nodes and weights of the Gauss-Legendre rule on [0, 1]."""
+    if order in _RULES:
+        return _RULES[order]
+    return _rule(order)
+
+
+def _tanh_sinh(size):
+    """Nodes, their distances from 1 and weights of the tanh-sinh rule of\
+    size nodes on [0, 1]."""
+    if size in _TANH_SINH_RULES:
+        return _TANH_SINH_RULES[size]
+    return _tanh_sinh_rule(size)
+
+
+def _composite(order, panels):
+    """Nodes, their distances from 1 and weights of the composite\
+    Gauss-Legendre rule of panels equal panels on [0, 1]."""
+    nodes, weights = _gauss_legendre(order)
+    steps = (np.arange(panels)[:, None] + nodes).ravel() / panels
+    return steps, 1 - steps, np.tile(weights, panels) / panels
+
+
+def _stirling_rest(x_val):
+    """log Gamma(x) - (x - 1/2) log x + x - log(2 pi) / 2, from Stirling's\
+    series for large x."""
+    if x_val < STIRLING_MIN:
+        return gammaln(x_val) - (x_val - 0.5) * np.log(x_val) + x_val - np.log(2 * np.pi) / 2
+    inv = 1. / x_val
+    inv2 = inv * inv
+    return inv * (1. / 12 - inv2 * (1. / 360 - inv2 * (1. / 1260 - inv2 * (
+        1. / 1680 - inv2 / 1188))))
+
+
+def _log_beta_pdf(y_val, y_rest, alpha, b):
+    """Log density of B(alpha, b) at y_val strictly between 0 and 1, with\
+    y_rest = 1 - y_val.
+
+    The powers are taken relative to the mean, which cancels the large terms
+    of log B(alpha, b) exactly; betaln loses about 1e-10 to them once alpha
+    and b are in the thousands.
+    """
+    total = alpha + b
+    mean, mean_rest = alpha / total, b / total
+    return ((alpha - 1) * np.log(y_val / mean) + (b - 1) * np.log(y_rest / mean_rest) +
+            (np.log(total / (mean * mean_rest)) - np.log(2 * np.pi)) / 2 -
+            _stirling_rest(alpha) - _stirling_rest(b) + _stirling_rest(total))
+
+
+def _tail_quantile(alpha, b):
+    """TAIL quantile of B(alpha, b).
+
+    Older SciPy returns values near 0 from betaincinv when alpha is large and
+    b small; a quantile with too little probability below it is then found by
+    bisection up to the mean.
+    """
+    x_val = betaincinv(alpha, b, TAIL)
+    if betainc(alpha, b, x_val) < TAIL / 2:
+        low, high = x_val, alpha / (alpha + b)
+        for _ in range(QUANTILE_STEPS):
+            mid = (low + high) / 2
+            if betainc(alpha, b, mid) < TAIL:
+                low = mid
+            else:
+                high = mid
+        x_val = low
+    return x_val
+
+
+def distri_quad(z_val, theta, phi, alpha, b, order=ORDER, panels=PANELS):
+    """Calculates the distribution of a ratio X / Y of beta distributions,\
+    X ~ B(theta, phi) and Y ~ B(alpha, b), by quadrature.
+
+    Parameters
+    ==========
+
+    z_val : Number or array of non-negative ratio values
+    theta, phi : Parameters of the beta distribution in the numerator
+    alpha, b : Parameters of the beta distribution in the denominator
+    order : Number of nodes in each panel
+    panels : Number of equal panels the integration range is split into;\
+                where a parameter below SMOOTH_PARAM makes the integrand\
+                rough next to the range a tanh-sinh rule of as many nodes\
+                is used instead
+
+    Returns
+    =======
+
+    The distribution as a float, or an array shaped like z_val
+
+    See Also
+    =======
+
+    quad_error : Error estimate of the rule
+    distri_series : Distribution from the hypergeometric series
+
+    Examples
+    ========
+
+    >>> distri_quad(0.43, 56, 310, 126, 228)
+    0.5089553...
+
+    """
+    z_arr = np.asarray(z_val, dtype=float)
+    flat = z_arr.ravel()
+    out = np.zeros(flat.shape)
+    pos = flat > 0
+    z_pos = flat[pos]
+    # Upper quantiles through the mirrored distribution, as 1 - TAIL == 1
+    x_low = _tail_quantile(theta, phi)
+    x_comp = _tail_quantile(phi, theta)
+    y_low = _tail_quantile(alpha, b)
+    y_comp = _tail_quantile(b, alpha)
+    # Above the TAIL quantile of X / z the incomplete beta is one (exactly so
+    # above y = 1 / z), leaving the tail of Y; the end of the range is kept as
+    # its distance from 1
+    start = np.maximum(y_low, x_low / z_pos)
+    stop_comp = np.maximum(np.maximum(y_comp, (z_pos - 1 + x_comp) / z_pos), 0)
+    width = np.maximum(1 - stop_comp - start, 0.)
+    # The integrand is rough where y^(alpha - 1) or I_(z y)(theta, phi) meet
+    # y = 0, (1 - y)^(b - 1) meets y = 1, or I_(z y)(theta, phi) meets y = 1 / z,
+    # and Y has some probability there; a narrow peak of Y is better served
+    # by Gauss-Legendre
+    near = ROUGH_NEAR * width
+    rough_low = ((min(alpha, theta) < SMOOTH_PARAM) & (start < near) &
+                 (betainc(alpha, b, start + near) > ROUGH_MASS))
+    rough_high = ((((b < SMOOTH_PARAM) & (stop_comp < near)) |
+                   ((phi < SMOOTH_PARAM) & ((1 - z_pos + z_pos * stop_comp) < near * z_pos))) &
+                  (betainc(b, alpha, np.minimum(stop_comp + near, 1)) > ROUGH_MASS))
+    rough = rough_low | rough_high
+    # There the end is moved onto the point itself, as the tanh-sinh rule
+    # copes with a singularity at an end but not with one just beyond it
+    start = np.where(rough_low, y_low, start)
+    stop_comp = np.where(rough_high, np.maximum(y_comp, (z_pos - 1) / z_pos), stop_comp)
+    tail = betainc(b, alpha, stop_comp)
+    width = np.maximum(1 - stop_comp - start, 0.)
+    nodes, comps, weights = (np.where(rough[:, None], tanh_sinh, gauss) for tanh_sinh, gauss
+                             in zip(_tanh_sinh(order * panels), _composite(order, panels)))
+    # Nodes of empty ranges are all at start, inside (0, 1); their weight is zero
+    tiny = np.finfo(float).tiny
+    y_val = np.clip(start[:, None] + width[:, None] * nodes, tiny, 1)
+    y_rest = np.clip(np.minimum(stop_comp, 1 - start)[:, None] + width[:, None] * comps,
+                     tiny, 1)
+    # Next to y = 1 / z the incomplete beta is one less a power of 1 - z y,
+    # which is taken from 1 - y so that it is not lost to rounding at z = 1
+    x_rest = (1 - z_pos)[:, None] + z_pos[:, None] * y_rest
+    upper = x_rest < 0.5
+    inc = betainc(np.where(upper, phi, theta), np.where(upper, theta, phi),
+                  np.where(upper, np.maximum(x_rest, 0), np.minimum(1, z_pos[:, None] * y_val)))
+    integrand = (np.where(upper, 1 - inc, inc) *
+                 np.exp(_log_beta_pdf(y_val, y_rest, alpha, b)))
+    out[pos] = np.sum(integrand * weights, axis=1) * width + tail
+    out = np.clip(out, 0, 1).reshape(z_arr.shape)
+    return out if out.ndim else float(out)
+
+
+def quad_error(z_val, theta, phi, alpha, b, order=ORDER, panels=PANELS):
+    """Estimates the largest absolute error of distri_quad at the given\
+    values of the ratio, by comparing it with a rule of twice the order.
+
+    Parameters
+    ==========
+
+    z_val : Number or array of non-negative ratio values
+    theta, phi : Parameters of the beta distribution in the numerator
+    alpha, b : Parameters of the beta distribution in the denominator
+    order : Number of nodes in each panel
+    panels : Number of equal panels the integration range is split into
+
+    Returns
+    =======
+
+    The error estimate as a float
+
+    See Also
+    =======
+
+    distri_quad : Distribution by quadrature
+
+    """
+    return float(np.max(np.abs(
+        distri_quad(z_val, theta, phi, alpha, b, order, panels) -
+        distri_quad(z_val, theta, phi, alpha, b, 2 * order, panels))))
+
+
+def reference_rule(alpha, b, order=ORDER, panels=REFERENCE_PANELS):
+    """Works out the nodes of a Gauss-Legendre rule over the range of\
+    Y ~ B(alpha, b), with the weights multiplied by the density of Y.
+
+    Parameters
+    ==========
+
+    alpha, b : Parameters of the beta distribution in the denominator
+    order : Number of nodes in each panel
+    panels : Number of equal panels the range of Y is split into
+
+    Returns
+    =======
+
+    A tuple of the nodes and the weighted densities, both arrays
+
+    See Also
+    =======
+
+    distri_reference : Distribution from a reference rule
+
+    """
+    y_low = _tail_quantile(alpha, b)
+    y_upp = 1 - _tail_quantile(b, alpha)
+    nodes, weights = _gauss_legendre(order)
+    y_val = y_low + (y_upp - y_low) * (np.arange(panels)[:, None] + nodes).ravel() / panels
+    return y_val, (np.tile(weights, panels) * (y_upp - y_low) / panels *
+                   np.exp(_log_beta_pdf(y_val, 1 - y_val, alpha, b)))
+
+
+def distri_reference(z_val, theta, phi, rule):
+    """Calculates the distribution of a ratio X / Y of beta distributions,\
+    X ~ B(theta, phi), with the rule of Y from reference_rule.
+
+    Parameters
+    ==========
+
+    z_val : Number or array of non-negative ratio values
+    theta, phi : Parameters of the beta distribution in the numerator
+    rule : Nodes and weighted densities of Y from reference_rule
+
+    Returns
+    =======
+
+    The distribution as a float, or an array shaped like z_val
+
+    See Also
+    =======
+
+    reference_rule : Rule of the reference Y
+    distri_quad : Distribution with a rule fitted to X and Y
+
+    Examples
+    ========
+
+    >>> distri_reference(0.43, 56, 310, reference_rule(126, 228))
+    0.5089553...
+
+    """
+    y_val, weights = rule
+    z_arr = np.asarray(z_val, dtype=float)
+    # 1 - I_(z y)(theta, phi) = I_(1 - z y)(phi, theta) is summed instead, as
+    # it vanishes above y = 1 / z: the tail of Y beyond that point is then
+    # counted exactly rather than through the weights of the rule
+    x_rest = np.maximum(1 - np.maximum(z_arr, 0)[..., None] * y_val, 0)
+    out = 1 - np.dot(betainc(phi, theta, x_rest), weights)
+    out = np.clip(out, 0, 1)
+    return out if out.ndim else float(out)
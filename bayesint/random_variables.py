@@ -4,17 +4,49 @@
 """Random variables.
 
 Allows for the calculation of the expression for the density (densi_frac) and
-distribution (distri_frac) of a ratio of two independent beta distributions.
+distribution (distri_frac) of a ratio of two independent beta distributions,
+and for their numerical evaluation (densi_frac_num, distri_frac_num). The
+numerical distribution is evaluated by quadrature, or from the hypergeometric
+series where that is a polynomial which costs less at the ratios asked for
+and is accurate enough; the choice is made beforehand from the parameters of
+the table and the number of ratios.
+The posterior probability that the ratio exceeds a threshold can be found
+for arrays of tables and thresholds at once (prob_ratio_exceeds), and the
+density and distribution of one table on a fine grid of ratios, for plotting
+or export, in one structured array (frac_curves).
 
 """
 
 #from builtins import *
+import numpy as np
 from sympy import hyper, symbols, Piecewise
 from sympy.functions.special.beta_functions import beta
 from sympy.abc import alpha, b, phi, theta, z, P, C, M, N
 
+from .hypergeometric import densi_series, distri_series
+from .quadrature import ORDER, PANELS, distri_quad
+
 PI_1, PI_2, PI_3, PI_4 = symbols('pi:4')
 
+# Default absolute tolerance of the numerical distribution
+TOL = 1e-10
+# Ways of evaluating the numerical distribution
+DISTRI_METHODS = ('auto', 'series', 'quad')
+# Absolute error of a polynomial series, as measured against mpmath for counts
+# up to the tens of thousands (that of distri_quad is below 1e-11)
+SERIES_ERROR = 1e-10
+# Cost of one node of the quadrature at one ratio, and of working out one
+# coefficient of a polynomial series, in steps of Horner's rule at one ratio
+QUAD_NODE_COST = 40.
+SERIES_COEF_COST = 20.
+# Default number of ratios of a curve
+CURVE_POINTS = 100000
+# Width of the default grid of a curve, in coefficients of variation either
+# side of the centre
+CURVE_WIDTH = 6.
+# Fields of the structured array holding a curve
+CURVE_DTYPE = np.dtype([('z', np.float64), ('pdf', np.float64), ('cdf', np.float64)])
+
 ## Probabilty-related functions
 ### Prior density
 def densi_frac(p_val, c_val, m_val, n_val, pri_val, frac_type):
@@ -195,3 +227,419 @@ def distri_frac(p_val, c_val, m_val, n_val, pri_val, frac_type):
             raise NotImplementedError('distribution of odds ratio not currently implemented')
         else:
             raise ValueError('frac_type must be "risk" or "odds"')
+
+
+def _beta_params(p_val, c_val, m_val, n_val, pri_val):
+    """Checks the counts and priors and gives the parameters alpha, b, theta\
+    and phi of the two beta distributions B(alpha, b) and B(theta, phi)."""
+    if not (isinstance(p_val, int) and isinstance(c_val, int) and
+            isinstance(m_val, int) and isinstance(n_val, int)):
+        raise TypeError('Count inputs must be integers')
+    if c_val <= pri_val[0]:
+        raise ValueError('C ({:f}) must be larger than pi1 ({:f})'.format(
+            c_val, pri_val[0]))
+    elif n_val - c_val <= pri_val[1]:
+        raise ValueError('N - C ({:f}) must be larger than pi2 ({:f})'.format(
+            n_val - c_val, pri_val[1]))
+    elif p_val <= pri_val[2]:
+        raise ValueError('P ({:f}) must be larger than pi3 ({:f})'.format(
+            p_val, pri_val[2]))
+    elif m_val - p_val <= pri_val[3]:
+        raise ValueError('M - P ({:f}) must be larger than pi4 ({:f})'.format(
+            m_val - p_val, pri_val[3]))
+    elif c_val < 0 or p_val < 0 or n_val < 0 or m_val < 0:
+        raise ValueError('One or more counts are negative')
+    return (c_val + pri_val[0], n_val - c_val + pri_val[1],
+            p_val + pri_val[2], m_val - p_val + pri_val[3])
+
+
+### Numerical density
+def densi_frac_num(z_val, p_val, c_val, m_val, n_val, pri_val, frac_type):
+    """Evaluates the density of a ratio of beta distributions at given values\
+    of the ratio, without building the symbolic expression of densi_frac.
+
+    Parameters
+    ==========
+
+    z_val : Number or array of values of the ratio
+    p_val : Number of exposed in group one
+    c_val : Number of exposed in group two
+    m_val : Total number in group one
+    n_val : Total number in group two
+    pri_val : Tuple containing belief parameters for the two beta distributions,\
+                B(c_val + pi1, n_val - c_val + pi2) and B(p_val + pi3, m_val - p_val + pi4),\
+                given in the order: pi1, pi2, pi3, pi4
+    frac_type : Desired ratio - relative risk ("risk") or odds ratio ("odds")
+
+    Returns
+    =======
+
+    The density as a float, or an array shaped like z_val
+
+    Raises
+    ======
+
+    TypeError
+        Count inputs must be integers
+    ValueError
+        frac_type must be "risk" or "odds"
+        C must be larger than pi1
+        N - C must be larger than pi2
+        P must be larger than pi3
+        M - P must be larger than pi4
+        One or more counts are negative
+
+    See Also
+    =======
+
+    densi_frac : Density expression
+    distri_frac_num : Numerical posterior distribution
+
+    Examples
+    ========
+
+    >>> densi_frac_num(0.43, 56, 126, 366, 354, (0, 0, 0, 0), "risk")
+    6.512381...
+
+    """
+    alpha_val, b_val, theta_val, phi_val = _beta_params(p_val, c_val, m_val,
+                                                        n_val, pri_val)
+    if frac_type == 'odds':
+        raise NotImplementedError('numerical density of odds ratio not currently implemented')
+    elif frac_type != 'risk':
+        raise ValueError('frac_type must be "risk" or "odds"')
+    z_arr = np.asarray(z_val, dtype=float)
+    dens = np.zeros(z_arr.shape)
+    low = (z_arr > 0) & (z_arr <= 1)
+    upp = z_arr > 1
+    dens[low] = densi_series(z_arr[low], theta_val, phi_val, alpha_val, b_val)
+    # Above one, X / Y has the density of Y / X at 1 / z times 1 / z^2
+    inv = 1 / z_arr[upp]
+    dens[upp] = densi_series(inv, alpha_val, b_val, theta_val, phi_val) * inv ** 2
+    return dens if dens.ndim else float(dens)
+
+
+def _distri_series(z_arr, theta_val, phi_val, alpha_val, b_val):
+    """Distribution from the hypergeometric series, at an array of ratios."""
+    dist = np.zeros(z_arr.shape)
+    low = (z_arr > 0) & (z_arr <= 1)
+    upp = z_arr > 1
+    dist[low] = distri_series(z_arr[low], theta_val, phi_val, alpha_val, b_val)
+    # Above one, P(X / Y <= z) = 1 - P(Y / X < 1 / z)
+    dist[upp] = 1 - distri_series(1 / z_arr[upp], alpha_val, b_val,
+                                  theta_val, phi_val)
+    return np.clip(dist, 0, 1)
+
+
+def _ratio_spread(theta_val, phi_val, alpha_val, b_val):
+    """Ratio of the means of X and Y, and the coefficient of variation of\
+    X / Y from the delta method."""
+    mean_x = theta_val / (theta_val + phi_val)
+    mean_y = alpha_val / (alpha_val + b_val)
+    return mean_x / mean_y, np.sqrt(
+        (1 - mean_x) / (mean_x * (theta_val + phi_val + 1)) +
+        (1 - mean_y) / (mean_y * (alpha_val + b_val + 1)))
+
+
+def _series_cost(z_arr, theta_val, phi_val, alpha_val, b_val):
+    """Cost of the series at an array of ratios, in steps of Horner's rule,\
+    or None when a branch the ratios fall on is not a polynomial.
+
+    Below z = 1 the series is a polynomial of degree phi - 1 when phi is an
+    integer and b >= 1, and above z = 1 one of degree b - 1 when b is an
+    integer and phi >= 1; its coefficients are worked out once per call and
+    then used at every ratio of the branch.
+    """
+    cost = 0.
+    for points, degree, other in (
+            (np.count_nonzero((z_arr > 0) & (z_arr <= 1)), phi_val - 1, b_val),
+            (np.count_nonzero(z_arr > 1), b_val - 1, phi_val)):
+        if not points:
+            continue
+        if degree != np.floor(degree) or other < 1:
+            return None
+        cost += (degree + 1) * (SERIES_COEF_COST + points)
+    return cost
+
+
+def _auto_method(z_arr, theta_val, phi_val, alpha_val, b_val, tol):
+    """Method the "auto" method uses at an array of ratios.
+
+    The choice is made beforehand from a model of the cost and error of each
+    method: the quadrature costs the same at every ratio and is the more
+    accurate, while a polynomial series is within SERIES_ERROR and costs in
+    proportion to its degree, so it is used where that meets tol and costs
+    less. Other series converge more slowly than the quadrature and are no
+    more accurate, so they are never picked.
+    """
+    cost = _series_cost(z_arr, theta_val, phi_val, alpha_val, b_val)
+    if (cost is not None and tol >= SERIES_ERROR and
+            cost <= z_arr.size * ORDER * PANELS * QUAD_NODE_COST):
+        return 'series'
+    return 'quad'
+
+
+def _distri_function(theta_val, phi_val, alpha_val, b_val, tol=TOL):
+    """Distribution of X / Y as a function of z alone, with the method\
+    "auto" picks for each call."""
+    params = (theta_val, phi_val, alpha_val, b_val)
+
+    def distri(z_val):
+        z_arr = np.asarray(z_val, dtype=float)
+        if _auto_method(z_arr, *params, tol=tol) == 'quad':
+            dist = np.asarray(distri_quad(z_arr, *params))
+        else:
+            dist = _distri_series(z_arr, *params)
+        return dist if dist.ndim else float(dist)
+    return distri
+
+
+### Numerical posterior distribution
+def distri_frac_num(z_val, p_val, c_val, m_val, n_val, pri_val, frac_type,
+                    method='auto', tol=TOL):
+    """Evaluates the posterior distribution of a ratio of beta distributions\
+    at given values of the ratio, without building the symbolic expression of\
+    distri_frac.
+
+    Parameters
+    ==========
+
+    z_val : Number or array of values of the ratio
+    p_val : Number of exposed in group one
+    c_val : Number of exposed in group two
+    m_val : Total number in group one
+    n_val : Total number in group two
+    pri_val : Tuple containing belief parameters for the two beta distributions,\
+                B(c_val + pi1, n_val - c_val + pi2) and B(p_val + pi3, m_val - p_val + pi4),\
+                given in the order: pi1, pi2, pi3, pi4
+    frac_type : Desired ratio - relative risk ("risk") or odds ratio ("odds")
+    method : Evaluation from the hypergeometric series ("series"), by\
+                quadrature ("quad"), or by whichever of the two costs less for\
+                this table and number of ratios while meeting tol ("auto")
+    tol : Absolute tolerance the "auto" method has to meet; below\
+                SERIES_ERROR it always uses quadrature
+
+    Returns
+    =======
+
+    The distribution as a float, or an array shaped like z_val
+
+    Raises
+    ======
+
+    TypeError
+        Count inputs must be integers
+    ValueError
+        frac_type must be "risk" or "odds"
+        method must be "auto", "series" or "quad"
+        C must be larger than pi1
+        N - C must be larger than pi2
+        P must be larger than pi3
+        M - P must be larger than pi4
+        One or more counts are negative
+
+    See Also
+    =======
+
+    distri_frac : Posterior distribution expression
+    densi_frac_num : Numerical density
+
+    Examples
+    ========
+
+    >>> distri_frac_num(0.43, 56, 126, 366, 354, (0, 0, 0, 0), "risk")
+    0.508955...
+
+    """
+    alpha_val, b_val, theta_val, phi_val = _beta_params(p_val, c_val, m_val,
+                                                        n_val, pri_val)
+    if frac_type == 'odds':
+        raise NotImplementedError('distribution of odds ratio not currently implemented')
+    elif frac_type != 'risk':
+        raise ValueError('frac_type must be "risk" or "odds"')
+    if method not in DISTRI_METHODS:
+        raise ValueError('method must be "auto", "series" or "quad"')
+    params = (float(theta_val), float(phi_val), float(alpha_val), float(b_val))
+    z_arr = np.asarray(z_val, dtype=float)
+    if method == 'auto':
+        method = _auto_method(z_arr, *params, tol=float(tol))
+    if method == 'quad':
+        dist = np.asarray(distri_quad(z_arr, *params))
+    else:
+        dist = _distri_series(z_arr, *params)
+    return dist if dist.ndim else float(dist)
+
+
+### Posterior tail probability
+def prob_ratio_exceeds(p_val, c_val, m_val, n_val, pri_val, frac_type, threshold,
+                       method='auto', tol=TOL):
+    """Calculates the posterior probability that a ratio of beta distributions\
+    is above a threshold, for arrays of tables and thresholds.
+
+    Parameters
+    ==========
+
+    p_val : Number or array of numbers of exposed in group one
+    c_val : Number or array of numbers of exposed in group two
+    m_val : Number or array of totals in group one
+    n_val : Number or array of totals in group two
+    pri_val : Tuple containing belief parameters for the two beta distributions,\
+                B(c_val + pi1, n_val - c_val + pi2) and B(p_val + pi3, m_val - p_val + pi4),\
+                given in the order: pi1, pi2, pi3, pi4
+    frac_type : Desired ratio - relative risk ("risk") or odds ratio ("odds")
+    threshold : Number or array of thresholds of the ratio
+    method : Evaluation of the distribution, as in distri_frac_num. The\
+                default "auto" picks a method from the counts and thresholds\
+                before evaluating anything, so it takes about as long as\
+                "quad" at most and as "series" where the series is cheaper
+    tol : Absolute tolerance the "auto" method has to meet
+
+    Returns
+    =======
+
+    The probability as a float, or an array shaped like the counts and\
+        thresholds broadcast against each other; NaN where the threshold is\
+        NaN
+
+    Raises
+    ======
+
+    TypeError
+        Count inputs must be integers
+    ValueError
+        frac_type must be "risk" or "odds"
+        method must be "auto", "series" or "quad"
+        C must be larger than pi1
+        N - C must be larger than pi2
+        P must be larger than pi3
+        M - P must be larger than pi4
+        One or more counts are negative
+
+    See Also
+    =======
+
+    distri_frac_num : Numerical posterior distribution
+
+    Examples
+    ========
+
+    >>> prob_ratio_exceeds(56, 126, 366, 354, (0, 0, 0, 0), "risk", 0.43)
+    0.491044...
+    >>> prob_ratio_exceeds([56, 25], [126, 108], [366, 123], [354, 313],
+    ...                    (0, 0, 0, 0), "risk", [[0.5], [1]])
+    array([[1.36...e-01, 7.83...e-01],
+           [1.18...e-10, 1.38...e-03]])
+
+    """
+    arrays = np.broadcast_arrays(*(np.asarray(val) for val in
+                                   (p_val, c_val, m_val, n_val, threshold)))
+    if not all(np.issubdtype(arr.dtype, np.integer) or arr.size == 0
+               for arr in arrays[:4]):
+        raise TypeError('Count inputs must be integers')
+    tables = np.stack([arr.ravel().astype(np.int64) for arr in arrays[:4]], axis=1)
+    thresholds = arrays[4].ravel().astype(float)
+    prob = np.where(np.isnan(thresholds), np.nan, 1.)
+    # Each table is evaluated once, at all of its thresholds together
+    unique, inverse = np.unique(tables, axis=0, return_inverse=True)
+    order = np.argsort(inverse.ravel(), kind='stable')
+    groups = np.split(order, np.cumsum(np.bincount(inverse.ravel(),
+                                                   minlength=len(unique)))[:-1])
+    for (p_one, c_one, m_one, n_one), rows in zip(unique.tolist(), groups):
+        # Checked in the order given, so errors name the right counts
+        _beta_params(p_one, c_one, m_one, n_one, pri_val)
+        # Thresholds up to zero are exceeded surely, and NaN ones stay NaN
+        rows = rows[thresholds[rows] > 0]
+        levels, level_rows = np.unique(thresholds[rows], return_inverse=True)
+        # P(X / Y > t) = P(Y / X < 1 / t), which keeps the small upper tail
+        # probabilities accurate where 1 - P(X / Y <= t) would cancel
+        prob[rows] = distri_frac_num(1 / levels, c_one, p_one, n_one, m_one,
+                                     (pri_val[2], pri_val[3], pri_val[0], pri_val[1]),
+                                     frac_type, method, tol)[level_rows]
+    prob = prob.reshape(arrays[4].shape)
+    return prob if prob.ndim else float(prob)
+
+
+### Curves for plotting
+def frac_curves(p_val, c_val, m_val, n_val, pri_val, frac_type, z_val=None,
+                points=CURVE_POINTS):
+    """Evaluates the posterior density and distribution of a ratio of beta\
+    distributions on a grid of ratios, as array operations throughout.
+
+    The distribution is taken by the method "auto" of distri_frac_num picks
+    for the whole grid. For the density neighbouring ratios share the terms
+    of the hypergeometric series, so its time grows with the number of ratios
+    times the number of terms, which grows with the counts. A grid of 10^5
+    ratios takes well under a second for counts in the hundreds and integer
+    priors, a second or two with other priors, and a minute or more for
+    counts in the tens of thousands, nearly all of it in the density.
+
+    Parameters
+    ==========
+
+    p_val : Number of exposed in group one
+    c_val : Number of exposed in group two
+    m_val : Total number in group one
+    n_val : Total number in group two
+    pri_val : Tuple containing belief parameters for the two beta distributions,\
+                B(c_val + pi1, n_val - c_val + pi2) and B(p_val + pi3, m_val - p_val + pi4),\
+                given in the order: pi1, pi2, pi3, pi4
+    frac_type : Desired ratio - relative risk ("risk") or odds ratio ("odds")
+    z_val : Optional one dimensional array of ratios; by default points\
+            evenly spaced ratios covering all but a negligible part of the\
+            distribution
+    points : Number of ratios of the default grid
+
+    Returns
+    =======
+
+    A structured array of CURVE_DTYPE with fields "z", "pdf" and "cdf", one\
+        row per ratio in the order given, which can be plotted as it is or\
+        written out with numpy.save or numpy.savetxt
+
+    Raises
+    ======
+
+    TypeError
+        Count inputs must be integers
+    ValueError
+        frac_type must be "risk" or "odds"
+        z_val must be one dimensional
+        C must be larger than pi1
+        N - C must be larger than pi2
+        P must be larger than pi3
+        M - P must be larger than pi4
+        One or more counts are negative
+    NotImplementedError
+        numerical density of odds ratio not currently implemented
+
+    See Also
+    =======
+
+    densi_frac_num : Numerical posterior density
+    distri_frac_num : Numerical posterior distribution
+
+    Examples
+    ========
+
+    >>> curve = frac_curves(56, 126, 366, 354, (0, 0, 0, 0), "risk")
+    >>> pyplot.plot(curve['z'], curve['pdf'])
+
+    """
+    alpha_val, b_val, theta_val, phi_val = (
+        float(val) for val in _beta_params(p_val, c_val, m_val, n_val, pri_val))
+    if frac_type == 'odds':
+        raise NotImplementedError('numerical density of odds ratio not currently implemented')
+    elif frac_type != 'risk':
+        raise ValueError('frac_type must be "risk" or "odds"')
+    if z_val is None:
+        ratio, spread = _ratio_spread(theta_val, phi_val, alpha_val, b_val)
+        z_val = np.linspace(ratio * np.exp(-CURVE_WIDTH * spread),
+                            ratio * np.exp(CURVE_WIDTH * spread), points)
+    z_arr = np.asarray(z_val, dtype=float)
+    if z_arr.ndim != 1:
+        raise ValueError('z_val must be one dimensional')
+    curve = np.empty(len(z_arr), dtype=CURVE_DTYPE)
+    curve['z'] = z_arr
+    curve['pdf'] = densi_frac_num(z_arr, p_val, c_val, m_val, n_val, pri_val, frac_type)
+    curve['cdf'] = _distri_function(theta_val, phi_val, alpha_val, b_val)(z_arr)
+    return curve
@@ -0,0 +1,124 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+"""Results.
+
+Allows for interval results to be held as plain floats rather than as tuples
+of SymPy and mpmath numbers: one at a time in an IntervalResult, or many at
+once in a NumPy structured array of RESULT_DTYPE (pack_results), which can be
+written to disk as it is (numpy.save, numpy.memmap).
+
+"""
+
+#from builtins import *
+import numpy as np
+
+# Fields of the structured array holding a batch of results
+RESULT_DTYPE = np.dtype([('p_val', np.int64), ('c_val', np.int64),
+                         ('m_val', np.int64), ('n_val', np.int64),
+                         ('ratio', np.float64), ('lower', np.float64),
+                         ('upper', np.float64)])
+
+
+class IntervalResult(object):
+    """Ratio and credible interval of one table as floats.
+
+    Unpacks like the tuple returned by the interval functions, so
+    ``frac, low, upp = result`` works for either.
+
+    Parameters
+    ==========
+
+    ratio : Estimate of the ratio
+    lower : Lower value of the interval
+    upper : Upper value of the interval
+    diagnostics : Optional dictionary with details of how the interval was\
+                    found, for example from the minimisation
+
+    Examples
+    ========
+
+    >>> IntervalResult(236/549, 0.184135819539239, 0.667343920284484)
+    IntervalResult(ratio=0.4298724954462659, lower=0.184135819539239, upper=0.667343920284484)
+
+    """
+    __slots__ = ('ratio', 'lower', 'upper', 'diagnostics')
+
+    def __init__(self, ratio, lower, upper, diagnostics=None):
+        self.ratio = float(ratio)
+        self.lower = float(lower)
+        self.upper = float(upper)
+        self.diagnostics = diagnostics
+
+    @classmethod
+    def from_tuple(cls, result, diagnostics=None):
+        """Converts a (ratio, lower, upper) tuple of any numbers."""
+        ratio, lower, upper = result
+        return cls(ratio, lower, upper, diagnostics)
+
+    def __iter__(self):
+        return iter((self.ratio, self.lower, self.upper))
+
+    def __len__(self):
+        return 3
+
+    def __eq__(self, other):
+        if not isinstance(other, IntervalResult):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'IntervalResult(ratio={!r}, lower={!r}, upper={!r})'.format(
+            self.ratio, self.lower, self.upper)
+
+
+def pack_results(tables, results, out=None):
+    """Packs interval results into a NumPy structured array.
+
+    Parameters
+    ==========
+
+    tables : Sequence of tables, each given as (p_val, c_val, m_val, n_val)
+    results : Sequence of matching results, as tuples or IntervalResult
+    out : Optional array of RESULT_DTYPE to fill, of at least len(tables) rows
+
+    Returns
+    =======
+
+    The structured array of RESULT_DTYPE, one row per table
+
+    Raises
+    ======
+
+    ValueError
+        tables and results must have the same length
+        out must have RESULT_DTYPE and room for every table
+
+    See Also
+    =======
+
+    IntervalResult : Single result
+
+    Examples
+    ========
+
+    >>> pack_results([(56, 126, 366, 354)],
+    ...              [(236/549, 0.184135819539239, 0.667343920284484)])
+    array([(56, 126, 366, 354, 0.42987..., 0.18413..., 0.66734...)], ...)
+
+    """
+    if len(tables) != len(results):
+        raise ValueError('tables and results must have the same length')
+    if out is None:
+        out = np.empty(len(tables), dtype=RESULT_DTYPE)
+    elif out.dtype != RESULT_DTYPE or len(out) < len(tables):
+        raise ValueError('out must have RESULT_DTYPE and room for every table')
+    for row, (table, result) in enumerate(zip(tables, results)):
+        out[row] = tuple(table) + tuple(float(val) for val in result)
+    return out[:len(tables)]
@@ -0,0 +1,223 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+"""Worker.
+
+Allows the interval calculations to be served by a long-running process that
+reads JSON-lines requests on stdin and writes JSON-lines results on stdout
+(serve). The process keeps SymPy, the prepared kernels and its result cache
+warm for its whole lifetime, so non-Python callers only pay the start-up cost
+once. Run with ``python -m bayesint.worker``, adding ``--kernels PATH`` to load
+the kernels from an artifact written by ``bayesint-kernels PATH``
+instead of building them.
+
+A request is a JSON object on a single line, for example
+
+    {"id": 1, "method": "eqt", "counts": [56, 126, 366, 354],
+     "pri_val": [0, 0, 0, 0], "frac_type": "risk", "signif": 0.05}
+
+and each request gets one line back holding either a "result" or an "error".
+The interval is found from the numerical distribution unless the request
+asks for "ans": "estim" (or, for "eqt", "exact").
+
+"""
+
+import argparse
+import json
+import sys
+from collections import OrderedDict
+
+from .intervals import eqt_int_frac, hpd_int_frac
+from .kernels import load_kernels
+
+# Table used to warm up the process before the first request is read; the
+# symbolic answer is asked for as it is the one with kernels to build
+WARM_UP = {'method': 'eqt', 'counts': [56, 126, 366, 354],
+           'pri_val': [0, 0, 0, 0], 'frac_type': 'risk', 'signif': 0.05,
+           'ans': 'estim'}
+# Kinds of answer a request may ask for
+ANSWERS = ('numeric', 'estim', 'exact')
+
+
+def _eqt(args, ans, request):
+    """Equal-tailed interval for a parsed request."""
+    return eqt_int_frac(*args, ans=ans)
+
+
+def _hpd(args, ans, request):
+    """Highest posterior density interval for a parsed request."""
+    start = request.get('minimisation_start')
+    if start is not None:
+        start = tuple(float(val) for val in start)
+    return hpd_int_frac(*args, minimisation_start=start, ans=ans)
+
+
+METHODS = {'eqt': _eqt, 'hpd': _hpd}
+
+
+def _to_json(value):
+    """Converts SymPy, mpmath and NumPy numbers (and tuples of them) to floats."""
+    if isinstance(value, (tuple, list)):
+        return [_to_json(val) for val in value]
+    return float(value)
+
+
+def parse_request(request):
+    """Checks a decoded request and builds its cache key.
+
+    Parameters
+    ==========
+
+    request : Dictionary decoded from one JSON line
+
+    Returns
+    =======
+
+    A tuple with the method name, the positional arguments for the interval\
+        function, the kind of answer ("numeric" unless the request gives\
+        "ans") and the key used to deduplicate the request
+
+    Raises
+    ======
+
+    TypeError
+        Count inputs must be integers
+    ValueError
+        method must be one of the supported methods
+        counts must hold P, C, M and N
+        pri_val must hold pi_1, pi_2, pi_3 and pi_4
+        ans must be "numeric", "estim" or "exact"
+
+    """
+    method = request.get('method', 'eqt')
+    if method not in METHODS:
+        raise ValueError('method must be one of {}'.format(
+            ', '.join('"{}"'.format(name) for name in sorted(METHODS))))
+    counts = request.get('counts', ())
+    if len(counts) != 4:
+        raise ValueError('counts must hold P, C, M and N')
+    if not all(isinstance(count, int) and not isinstance(count, bool)
+               for count in counts):
+        raise TypeError('Count inputs must be integers')
+    pri_val = tuple(request.get('pri_val', (0, 0, 0, 0)))
+    if len(pri_val) != 4:
+        raise ValueError('pri_val must hold pi_1, pi_2, pi_3 and pi_4')
+    frac_type = request.get('frac_type', 'risk')
+    signif = request.get('signif', 0.05)
+    ans = request.get('ans', 'numeric')
+    if ans not in ANSWERS:
+        raise ValueError('ans must be {}'.format(
+            ' or '.join('"{}"'.format(name) for name in ANSWERS)))
+    args = tuple(counts) + (pri_val, frac_type, signif)
+    start = request.get('minimisation_start')
+    key = (method, args, ans, None if start is None else tuple(start))
+    return method, args, ans, key
+
+
+class ResultCache(OrderedDict):
+    """Least recently used store of results, holding at most maxsize entries."""
+
+    def __init__(self, maxsize):
+        OrderedDict.__init__(self)
+        self.maxsize = maxsize
+
+
+def handle_request(request, cache):
+    """Computes (or looks up) the result for one decoded request.
+
+    Parameters
+    ==========
+
+    request : Dictionary decoded from one JSON line
+    cache : ResultCache of earlier results keyed on the request, or None
+
+    Returns
+    =======
+
+    A dictionary with the request id and either the result as a list of\
+        floats (ratio, lower, upper) or an error message
+
+    """
+    reply = {'id': request.get('id')}
+    try:
+        method, args, ans, key = parse_request(request)
+        if cache is not None and key in cache:
+            result = cache.pop(key)
+            reply['cached'] = True
+        else:
+            result = _to_json(METHODS[method](args, ans, request))
+        if cache is not None and cache.maxsize > 0:
+            cache[key] = result
+            while len(cache) > cache.maxsize:
+                cache.popitem(last=False)
+        reply['result'] = result
+    except Exception as err:
+        reply['error'] = '{}: {}'.format(type(err).__name__, err)
+    return reply
+
+
+def serve(instream, outstream, cache_size=10000, warm_up=True):
+    """Answers JSON-lines requests until the input stream is exhausted.
+
+    Parameters
+    ==========
+
+    instream : File-like object yielding one JSON request per line
+    outstream : File-like object the JSON results are written to
+    cache_size : Number of distinct results kept for repeated requests
+    warm_up : Whether to evaluate a table before reading the first request,\
+                so the first caller does not pay for building the kernels
+
+    Examples
+    ========
+
+    >>> import io
+    >>> out = io.StringIO()
+    >>> serve(io.StringIO(u'{"id": 1, "counts": [56, 126, 366, 354]}\\n'), out)
+    >>> out.getvalue()
+    '{"id": 1, "result": [0.42987249544626593, 0.32124705463159703, 0.562634405120767]}\\n'
+
+    """
+    cache = ResultCache(cache_size)
+    if warm_up:
+        handle_request(dict(WARM_UP), None)
+    for line in instream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('request must be a JSON object')
+        except ValueError as err:
+            reply = {'id': None, 'error': 'ValueError: {}'.format(err)}
+        else:
+            reply = handle_request(request, cache)
+        outstream.write(u'{}\n'.format(json.dumps(reply)))
+        outstream.flush()
+
+
+def main(argv=None):
+    """Command line entry point reading stdin and writing stdout."""
+    parser = argparse.ArgumentParser(
+        description='Serve bayesint intervals as JSON lines over stdin/stdout.')
+    parser.add_argument('--cache-size', type=int, default=10000,
+                        help='number of distinct results kept (default 10000)')
+    parser.add_argument('--no-warm-up', action='store_true',
+                        help='skip evaluating a table before the first request')
+    parser.add_argument('--kernels', metavar='PATH',
+                        help='trusted kernel artifact to load instead of building the '
+                        'kernels; its code is run')
+    options = parser.parse_args(argv)
+    if options.kernels:
+        try:
+            load_kernels(options.kernels)
+        except (IOError, OSError, ValueError) as err:
+            # A stale or missing artifact only costs the time to rebuild
+            sys.stderr.write('bayesint-worker: kernels will be built: {}\n'.format(err))
+    serve(sys.stdin, sys.stdout, cache_size=options.cache_size,
+          warm_up=not options.no_warm_up)
+
+
+if __name__ == '__main__':
+    main()
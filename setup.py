@@ -43,6 +43,9 @@ setup(name='bayesint',
           'scipy>=0.19.1',
           'sympy>=1.1.1',
           'numpy>=1.13.3'],
+      entry_points={
+          'console_scripts': ['bayesint-worker = bayesint.worker:main',
+                              'bayesint-kernels = bayesint.kernels:main']},
       test_suite='tests.test_suite_loader',
       setup_requires=setup_requires,
 )
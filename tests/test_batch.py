@@ -0,0 +1,89 @@
+'''
+Testing the out-of-core batch driver
+'''
+from __future__ import division
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from scipy.stats.distributions import chi2
+from bayesint import run_batch, eqt_int_frac, hpd_int_frac, chi_sq_stat
+
+BATCH_INPUTS = [
+    (56, 126, 366, 354),
+    (25, 108, 123, 313),
+    (3, 2, 10, 12),
+    (0, 126, 366, 354),
+    (120, 126, 366, 354)
+    ]
+
+BATCH_PRIORS = (1/2, 1/2, 1/2, 1/2)
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test the batch driver on .npy files
+    '''
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for idx, name in enumerate('pcmn'):
+            path = os.path.join(self.directory, name + '.npy')
+            np.save(path, np.array([table[idx] for table in BATCH_INPUTS]))
+            self.paths.append(path)
+        self.out_dir = os.path.join(self.directory, 'results')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_run_batch(self):
+        paths = run_batch(*self.paths, out_dir=self.out_dir, pri_val=BATCH_PRIORS,
+                          chunk_size=2)
+        self.assertEqual(paths['failed'], 1)
+        tables = np.load(paths['tables'], mmap_mode='r')
+        equal = np.load(paths['equal'], mmap_mode='r')
+        hpd = np.load(paths['hpd'], mmap_mode='r')
+        for row, table in enumerate(BATCH_INPUTS):
+            if table[0] == 0:
+                self.assertTrue(np.isnan(equal['lower'][row]))
+                continue
+            stat = float(chi_sq_stat(*table))
+            self.assertAlmostEqual(tables['chi_sq_stat'][row], stat, places=10)
+            self.assertAlmostEqual(tables['chi_sq_prob'][row], chi2.sf(stat, 1), places=12)
+            expected = eqt_int_frac(*table, pri_val=BATCH_PRIORS, frac_type="risk",
+                                    signif=0.05, ans="numeric")
+            self.assertEqual(tuple(equal[row])[:4], table)
+            self.assertEqual(tuple(equal[row])[4:], expected)
+            expected = hpd_int_frac(*table, pri_val=BATCH_PRIORS, frac_type="risk",
+                                    signif=0.05, minimisation_start=None, ans="numeric")
+            self.assertEqual(tuple(hpd[row])[4:], expected)
+
+    def test_resume(self):
+        def stop_after_first_chunk(done, size):
+            raise KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            run_batch(*self.paths, out_dir=self.out_dir, int_types=('equal',),
+                      chunk_size=2, progress=stop_after_first_chunk)
+        calls = []
+        paths = run_batch(*self.paths, out_dir=self.out_dir, int_types=('equal',),
+                          chunk_size=2, progress=lambda done, size: calls.append(done))
+        self.assertEqual(calls, [4, 5])
+        equal = np.load(paths['equal'], mmap_mode='r')
+        self.assertEqual(equal['p_val'].tolist(), [table[0] for table in BATCH_INPUTS])
+        with self.assertRaises(ValueError):
+            run_batch(*self.paths, out_dir=self.out_dir, signif=0.01)
+
+    def test_options(self):
+        # Options every table would fail on stop the job before it starts
+        for options in ({'frac_type': 'rsik'}, {'signif': 5}, {'ans': 'exact'},
+                        {'int_types': ('median',)}):
+            with self.assertRaises(ValueError):
+                run_batch(*self.paths, out_dir=self.out_dir, **options)
+        with self.assertRaises(NotImplementedError):
+            run_batch(*self.paths, out_dir=self.out_dir, frac_type='odds')
+        self.assertFalse(os.path.exists(self.out_dir))
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,114 @@
+'''
+Testing the numerical density and distribution functions
+'''
+from __future__ import division
+import unittest
+from bayesint import densi_frac_num, distri_frac_num
+
+# Reference values from mpmath at 40 digits (z = 1 by quadrature)
+FRAC_NUM_INPUTS = [
+    (0.3, 56, 126, 366, 354, (0, 0, 0, 0), "risk"),
+    (0.43, 56, 126, 366, 354, (0, 0, 0, 0), "risk"),
+    (0.6, 56, 126, 366, 354, (0, 0, 0, 0), "risk"),
+    (0.98, 56, 126, 366, 354, (0, 0, 0, 0), "risk"),
+    (1.0, 56, 126, 366, 354, (0, 0, 0, 0), "risk"),
+    (1.02, 56, 126, 366, 354, (0, 0, 0, 0), "risk"),
+    (0.43, 25, 108, 123, 313, (1/2, 1/2, 1/2, 1/2), "risk"),
+    (0.98, 25, 108, 123, 313, (1/2, 1/2, 1/2, 1/2), "risk"),
+    (1.0, 25, 108, 123, 313, (1/2, 1/2, 1/2, 1/2), "risk"),
+    (1.5, 25, 108, 123, 313, (1/2, 1/2, 1/2, 1/2), "risk"),
+    (0.6, 120, 126, 366, 354, (1, 1, 1, 1), "risk"),
+    (0.98, 120, 126, 366, 354, (1, 1, 1, 1), "risk"),
+    (1.0, 120, 126, 366, 354, (1, 1, 1, 1), "risk"),
+    (1.02, 120, 126, 366, 354, (1, 1, 1, 1), "risk"),
+    (0.98, 120, 126, 366, 354, (1/3, 1/3, 1/3, 1/3), "risk"),
+    (1.0, 120, 126, 366, 354, (1/3, 1/3, 1/3, 1/3), "risk"),
+    (1.02, 120, 126, 366, 354, (1/3, 1/3, 1/3, 1/3), "risk"),
+    (0.3, 3, 2, 10, 12, (1, 1, 1, 1), "risk"),
+    (1.0, 3, 2, 10, 12, (1, 1, 1, 1), "risk"),
+    (1.5, 3, 2, 10, 12, (1, 1, 1, 1), "risk"),
+    (0.95, 89, 4, 100, 5, (1/2, 1/2, 1/2, 1/2), "risk"),
+    (0.99, 89, 4, 100, 5, (1/2, 1/2, 1/2, 1/2), "risk"),
+    (1.0, 3, 3, 5000, 5000, (1/2, 1/2, 1/2, 1/2), "risk")
+    ]
+
+FRAC_NUM_OUTPUTS = [
+    (0.47561470916308318, 0.0080669763371200885),
+    (6.5123811282360288, 0.50895532637006353),
+    (0.25442372306073769, 0.99258975003253775),
+    (1.6021935771602349e-8, 0.99999999967894211),
+    (5.9156241141383042e-9, 0.9999999998818777),
+    (2.1756881638613966e-9, 0.9999999999566792),
+    (1.2751144605125963, 0.05945632387595247),
+    (0.044347255863200677, 0.99771047480664521),
+    (0.030619470110667112, 0.99845228575934928),
+    (3.5493911906168321e-7, 0.99999998601994213),
+    (0.0014050353561796292, 2.1035792375539004e-5),
+    (3.3070975324735746, 0.72465954544304499),
+    (2.8275845976014631, 0.78606227235963453),
+    (2.3360136235016303, 0.83768468017122688),
+    (3.2930581872030999, 0.72527993160151195),
+    (2.8159296082998568, 0.78642446028381615),
+    (2.3272122091711813, 0.83784197431281928),
+    (0.097097998362584843, 0.0087229715235880611),
+    (0.46747303040209219, 0.2392938868911409),
+    (0.39562963742622774, 0.46122297284006125),
+    (2.1667399791568539, 0.12216495208135488),
+    (2.2534538372656799, 0.21185651416819249),
+    (0.50947415614601494, 0.5)
+    ]
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test the numerical density and distribution functions
+    '''
+    def test_densi_frac_num(self):
+        for input_set, output_set in zip(FRAC_NUM_INPUTS, FRAC_NUM_OUTPUTS):
+            test_result = densi_frac_num(*input_set)
+            self.assertIsInstance(test_result, float,
+                                  'densi_frac_num must return a float for a number.')
+            self.assertAlmostEqual(test_result,
+                                   output_set[0],
+                                   delta=1e-9 * output_set[0],
+                                   msg='The result for {} gave {}, expected {}.'
+                                   ''.format(input_set, test_result, output_set[0]))
+
+    def test_distri_frac_num(self):
+        for input_set, output_set in zip(FRAC_NUM_INPUTS, FRAC_NUM_OUTPUTS):
+            test_result = distri_frac_num(*input_set)
+            self.assertAlmostEqual(test_result,
+                                   output_set[1],
+                                   places=10,
+                                   msg='The result for {} gave {}, expected {}.'
+                                   ''.format(input_set, test_result, output_set[1]))
+
+    def test_array_input(self):
+        z_vals = [input_set[0] for input_set in FRAC_NUM_INPUTS[:6]]
+        test_result = distri_frac_num(z_vals, *FRAC_NUM_INPUTS[0][1:])
+        self.assertEqual(test_result.shape, (6,))
+        for test_value, output_set in zip(test_result, FRAC_NUM_OUTPUTS[:6]):
+            self.assertAlmostEqual(test_value, output_set[1], places=10)
+
+    def test_methods(self):
+        for input_set, output_set in zip(FRAC_NUM_INPUTS, FRAC_NUM_OUTPUTS):
+            for method in ("series", "quad", "auto"):
+                test_result = distri_frac_num(*input_set, method=method)
+                self.assertAlmostEqual(test_result,
+                                       output_set[1],
+                                       places=10,
+                                       msg='The {} result for {} gave {}, expected {}.'
+                                       ''.format(method, input_set, test_result,
+                                                 output_set[1]))
+        with self.assertRaises(ValueError):
+            distri_frac_num(*FRAC_NUM_INPUTS[0], method="simpson")
+
+    def test_odds(self):
+        with self.assertRaises(NotImplementedError):
+            distri_frac_num(0.5, 56, 126, 366, 354, (0, 0, 0, 0), "odds")
+        with self.assertRaises(ValueError):
+            distri_frac_num(0.5, 56, 126, 366, 354, (0, 0, 0, 0), "diff")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
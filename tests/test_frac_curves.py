@@ -0,0 +1,86 @@
+'''
+Testing the curves of the numerical density and distribution
+'''
+from __future__ import division
+import unittest
+import numpy as np
+from bayesint import frac_curves, densi_frac_num, distri_frac_num, CURVE_DTYPE
+
+# Tables with ratios and reference values as in test_distri_frac_num
+FRAC_CURVES_INPUTS = [
+    ((0.3, 0.43, 0.6, 0.98, 1.0, 1.02), 56, 126, 366, 354, (0, 0, 0, 0), "risk"),
+    ((0.43, 0.98, 1.0, 1.5), 25, 108, 123, 313, (1/2, 1/2, 1/2, 1/2), "risk"),
+    ((0.98, 1.0, 1.02), 120, 126, 366, 354, (1/3, 1/3, 1/3, 1/3), "risk")
+    ]
+
+FRAC_CURVES_OUTPUTS = [
+    [(0.47561470916308318, 0.0080669763371200885),
+     (6.5123811282360288, 0.50895532637006353),
+     (0.25442372306073769, 0.99258975003253775),
+     (1.6021935771602349e-8, 0.99999999967894211),
+     (5.9156241141383042e-9, 0.9999999998818777),
+     (2.1756881638613966e-9, 0.9999999999566792)],
+    [(1.2751144605125963, 0.05945632387595247),
+     (0.044347255863200677, 0.99771047480664521),
+     (0.030619470110667112, 0.99845228575934928),
+     (3.5493911906168321e-7, 0.99999998601994213)],
+    [(3.2930581872030999, 0.72527993160151195),
+     (2.8159296082998568, 0.78642446028381615),
+     (2.3272122091711813, 0.83784197431281928)]
+    ]
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test the density and distribution curves
+    '''
+    def test_frac_curves(self):
+        for input_set, output_set in zip(FRAC_CURVES_INPUTS, FRAC_CURVES_OUTPUTS):
+            test_result = frac_curves(*input_set[1:], z_val=input_set[0])
+            self.assertEqual(test_result.dtype, CURVE_DTYPE)
+            for row, (z_val, (densi, distri)) in zip(test_result,
+                                                     zip(input_set[0], output_set)):
+                self.assertEqual(row['z'], z_val)
+                self.assertAlmostEqual(row['pdf'], densi, delta=1e-9 * densi,
+                                       msg='The density for {} at {} gave {}, expected {}.'
+                                       ''.format(input_set[1:], z_val, row['pdf'], densi))
+                self.assertAlmostEqual(row['cdf'], distri, places=10,
+                                       msg='The distribution for {} at {} gave {}, '
+                                       'expected {}.'.format(input_set[1:], z_val,
+                                                             row['cdf'], distri))
+
+    def test_default_grid(self):
+        for input_set in FRAC_CURVES_INPUTS:
+            test_result = frac_curves(*input_set[1:], points=20001)
+            self.assertEqual(len(test_result), 20001)
+            self.assertTrue(np.all(np.diff(test_result['z']) > 0))
+            self.assertTrue(np.all(np.diff(test_result['cdf']) >= -1e-12))
+            # The grid holds nearly all of the distribution, and the density
+            # integrates to the distribution
+            self.assertLess(test_result['cdf'][0], 1e-5)
+            self.assertGreater(test_result['cdf'][-1], 1 - 1e-5)
+            self.assertAlmostEqual(np.sum(np.diff(test_result['z']) *
+                                          (test_result['pdf'][1:] + test_result['pdf'][:-1]) / 2),
+                                   test_result['cdf'][-1] - test_result['cdf'][0],
+                                   places=6)
+
+    def test_points_agree(self):
+        input_set = FRAC_CURVES_INPUTS[1]
+        test_result = frac_curves(*input_set[1:], points=1001)
+        for row in test_result[::100]:
+            self.assertAlmostEqual(row['pdf'], densi_frac_num(row['z'], *input_set[1:]),
+                                   delta=1e-10 * row['pdf'])
+            # Against both methods, so the one the curve did not use is checked
+            for method in ('series', 'quad'):
+                self.assertAlmostEqual(row['cdf'], distri_frac_num(row['z'], *input_set[1:],
+                                                                   method=method),
+                                       places=10)
+
+    def test_errors(self):
+        with self.assertRaises(TypeError):
+            frac_curves(56.5, 126, 366, 354, (0, 0, 0, 0), "risk")
+        with self.assertRaises(ValueError):
+            frac_curves(56, 126, 366, 354, (0, 0, 0, 0), "risk", z_val=[[0.4]])
+        with self.assertRaises(ValueError):
+            frac_curves(56, 126, 366, 354, (0, 0, 0, 0), "ratio")
+        with self.assertRaises(NotImplementedError):
+            frac_curves(56, 126, 366, 354, (0, 0, 0, 0), "odds")
@@ -0,0 +1,53 @@
+'''
+Testing the function giving both intervals
+'''
+from __future__ import division
+import unittest
+from bayesint import eqt_int_frac, hpd_int_frac, frac_ints, IntervalResult
+
+FRAC_INTS_INPUTS = [
+    (56, 126, 366, 354, (0, 0, 0, 0), "risk", 0.05),
+    (25, 108, 123, 313, (1/2, 1/2, 1/2, 1/2), "risk", 0.05),
+    (120, 126, 366, 354, (1, 1, 1, 1), "risk", 0.1),
+    (3, 2, 10, 12, (1, 1, 1, 1), "risk", 0.05),
+    (5000, 2, 20000, 10, (0, 0, 0, 0), "risk", 0.05)
+    ]
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test frac_ints against the two interval functions
+    '''
+    def test_frac_ints(self):
+        for input_set in FRAC_INTS_INPUTS:
+            test_eqt, test_hpd = frac_ints(*input_set)
+            expected_eqt = eqt_int_frac(*input_set, ans="numeric")
+            expected_hpd = hpd_int_frac(*input_set, minimisation_start=None, ans="numeric")
+            self.assertEqual(test_eqt, expected_eqt)
+            for test_value, expected_value in zip(test_hpd, expected_hpd):
+                self.assertAlmostEqual(test_value, expected_value, places=7,
+                                       msg='The result for {} gave {}, expected {}.'
+                                       ''.format(input_set, test_hpd, expected_hpd))
+            # The highest posterior density interval is the shorter one
+            self.assertLessEqual(test_hpd[2] - test_hpd[1], test_eqt[2] - test_eqt[1])
+
+    def test_int_type(self):
+        input_set = FRAC_INTS_INPUTS[0]
+        self.assertEqual(frac_ints(*input_set, int_type="equal"),
+                         eqt_int_frac(*input_set, ans="numeric"))
+        self.assertEqual(frac_ints(*input_set, int_type="hpd"),
+                         hpd_int_frac(*input_set, minimisation_start=None, ans="numeric"))
+        test_result = frac_ints(*input_set, result_type="object")
+        self.assertIsInstance(test_result[0], IntervalResult)
+        self.assertIsInstance(test_result[1], IntervalResult)
+
+    def test_errors(self):
+        with self.assertRaises(TypeError):
+            frac_ints(56.5, 126, 366, 354, (0, 0, 0, 0), "risk", 0.05)
+        with self.assertRaises(ValueError):
+            frac_ints(56, 126, 366, 354, (0, 0, 0, 0), "risk", 0.05, "neither")
+        with self.assertRaises(ValueError):
+            frac_ints(56, 126, 366, 354, (0, 0, 0, 0), "risk", 0.05, ans="exact")
+        with self.assertRaises(ValueError):
+            frac_ints(56, 126, 366, 354, (0, 0, 0, 0), "ratio", 0.05)
+        with self.assertRaises(NotImplementedError):
+            frac_ints(56, 126, 366, 354, (0, 0, 0, 0), "odds", 0.05)
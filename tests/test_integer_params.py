@@ -0,0 +1,54 @@
+'''
+Testing the polynomial evaluation for integer parameters
+'''
+import unittest
+import numpy as np
+from bayesint import densi_frac_num, distri_frac_num
+
+# Tables with integer counts and priors
+INTEGER_INPUTS = [
+    (56, 126, 366, 354, (0, 0, 0, 0), "risk"),
+    (120, 126, 366, 354, (1, 1, 1, 1), "risk"),
+    (3, 2, 10, 12, (1, 1, 1, 1), "risk"),
+    (5000, 126, 20000, 354, (0, 0, 0, 0), "risk")
+    ]
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test the polynomial density and distribution of integer parameters
+    '''
+    def test_many_points(self):
+        # Many ratios are evaluated by Horner's rule, a few as sums of terms
+        for input_set in INTEGER_INPUTS:
+            z_vals = np.linspace(0.01, 3, 600)
+            test_densi = densi_frac_num(z_vals, *input_set)
+            test_distri = distri_frac_num(z_vals, *input_set, method='series')
+            for idx in range(0, 600, 50):
+                expected = densi_frac_num(z_vals[idx], *input_set)
+                self.assertAlmostEqual(test_densi[idx], expected,
+                                       delta=1e-10 * max(expected, 1e-300),
+                                       msg='The density for {} at {} gave {}, expected {}.'
+                                       ''.format(input_set, z_vals[idx], test_densi[idx],
+                                                 expected))
+                self.assertAlmostEqual(test_distri[idx],
+                                       distri_frac_num(z_vals[idx], *input_set,
+                                                       method='series'),
+                                       places=12)
+            self.assertTrue(np.all(np.diff(test_distri) >= -1e-12))
+
+    def test_near_integer_priors(self):
+        # Priors just off the integers take the general series
+        for input_set in INTEGER_INPUTS[:3]:
+            near_set = input_set[:4] + (tuple(pri + 1e-9 for pri in input_set[4]), "risk")
+            for z_val in (0.3, 0.6, 0.98, 1.0, 1.5):
+                expected = densi_frac_num(z_val, *near_set)
+                self.assertAlmostEqual(densi_frac_num(z_val, *input_set), expected,
+                                       delta=1e-6 * max(expected, 1e-300))
+                self.assertAlmostEqual(distri_frac_num(z_val, *input_set, method='series'),
+                                       distri_frac_num(z_val, *near_set, method='series'),
+                                       places=7)
+
+    def test_unit(self):
+        # P(X <= Y) from mpmath at 30 digits, summing the positive series
+        self.assertAlmostEqual(distri_frac_num(1.0, *INTEGER_INPUTS[3], method='series'),
+                               0.999993821909890254869548352142, places=10)
@@ -0,0 +1,73 @@
+'''
+Testing the kernel artifact
+'''
+from __future__ import division
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from bayesint import eqt_int_frac
+from bayesint.kernels import save_kernels, load_kernels, get_kernel, KERNEL_NAMES
+
+KERNELS_INPUTS = [
+    (0.43, 56, 126, 366, 354, 0, 0, 0, 0),
+    (0.98, 25, 108, 123, 313, 1/2, 1/2, 1/2, 1/2)
+    ]
+
+KERNELS_OUTPUTS = [
+    0.50895532637006353,
+    0.99771047480664521
+    ]
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test writing and reading the kernel artifact
+    '''
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'kernels.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        save_kernels(self.path)
+        kernels = load_kernels(self.path)
+        self.assertEqual(sorted(kernels), sorted(KERNEL_NAMES))
+        for name in KERNEL_NAMES:
+            self.assertIs(get_kernel(name), kernels[name])
+        for input_set, expected_value in zip(KERNELS_INPUTS, KERNELS_OUTPUTS):
+            self.assertAlmostEqual(float(kernels['distri_risk'](*input_set)),
+                                   expected_value, places=10)
+        test_result = eqt_int_frac(56, 126, 366, 354, (0, 0, 0, 0), "risk", 0.05, "estim")
+        self.assertAlmostEqual(float(test_result[1]), 0.184135819539239, places=10)
+
+    def _write_changed(self, change):
+        save_kernels(self.path)
+        with open(self.path) as stream:
+            artifact = json.load(stream)
+        change(artifact)
+        with open(self.path, 'w') as stream:
+            json.dump(artifact, stream)
+
+    def test_stale_artifact(self):
+        self._write_changed(lambda artifact: artifact.update(version='0.0.1'))
+        with self.assertRaises(ValueError):
+            load_kernels(self.path)
+        self._write_changed(lambda artifact: artifact.update(format=0))
+        with self.assertRaises(ValueError):
+            load_kernels(self.path)
+        # An artifact of other sources is refused even when the versions match,
+        # as in a tree that is not installed
+        self._write_changed(lambda artifact: artifact.update(digest='0' * 64))
+        with self.assertRaises(ValueError):
+            load_kernels(self.path)
+        self._write_changed(lambda artifact: artifact['kernels'].pop('hpd_risk'))
+        with self.assertRaises(ValueError):
+            load_kernels(self.path)
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,68 @@
+'''
+Testing the posterior updated with new counts
+'''
+from __future__ import division
+import unittest
+from bayesint import Posterior, IntervalResult, eqt_int_frac, hpd_int_frac
+
+# Starting tables and the counts added at each update
+POSTERIOR_INPUTS = [
+    ((56, 126, 366, 354), (0, 0, 0, 0), 0.05,
+     [(3, 2, 20, 15), (0, 4, 10, 10), (5, 1, 30, 20), (0, 0, 1, 0)]),
+    ((5, 7, 40, 45), (1/2, 1/2, 1/2, 1/2), 0.1,
+     [(1, 0, 3, 2), (2, 3, 10, 12), (20, 2, 40, 40)]),
+    ((300, 410, 2000, 2100), (1, 1, 1, 1), 0.05,
+     [(10, 12, 50, 50), (-10, -12, -50, -50)])
+    ]
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test the posterior against the intervals of the updated tables
+    '''
+    def test_update(self):
+        for table, pri_val, signif, deltas in POSTERIOR_INPUTS:
+            posterior = Posterior(*table, pri_val=pri_val, frac_type="risk", signif=signif)
+            for delta in [(0, 0, 0, 0)] + deltas:
+                posterior.update(*delta)
+                table = tuple(val + change for val, change in zip(table, delta))
+                self.assertEqual(posterior.table, table)
+                expected = {'equal': eqt_int_frac(*table, pri_val=pri_val, frac_type="risk",
+                                                  signif=signif, ans="numeric"),
+                            'hpd': hpd_int_frac(*table, pri_val=pri_val, frac_type="risk",
+                                                signif=signif, minimisation_start=None,
+                                                ans="numeric")}
+                for int_type, test_result in (('equal', posterior.eqt_int()),
+                                              ('hpd', posterior.hpd_int())):
+                    self.assertEqual(test_result[0], expected[int_type][0])
+                    for bound, expected_bound in zip(test_result[1:],
+                                                     expected[int_type][1:]):
+                        self.assertAlmostEqual(bound, expected_bound, places=7,
+                                               msg='The {} interval of {} gave {}, '
+                                               'expected {}.'.format(int_type, table,
+                                                                     test_result,
+                                                                     expected[int_type]))
+
+    def test_result_type(self):
+        posterior = Posterior(56, 126, 366, 354, (0, 0, 0, 0), "risk", 0.05)
+        test_result = posterior.hpd_int(result_type="object")
+        self.assertIsInstance(test_result, IntervalResult)
+        self.assertEqual(tuple(test_result), posterior.hpd_int())
+        self.assertIn('nfev', test_result.diagnostics)
+        self.assertEqual(tuple(posterior.eqt_int(result_type="object")), posterior.eqt_int())
+        self.assertRaises(ValueError, posterior.eqt_int, result_type="list")
+
+    def test_errors(self):
+        posterior = Posterior(56, 126, 366, 354, (0, 0, 0, 0), "risk", 0.05)
+        before = posterior.eqt_int()
+        self.assertRaises(TypeError, posterior.update, 1.0, 0, 1, 0)
+        self.assertRaises(ValueError, posterior.update, 0, 0, -320, 0)
+        # A failed update leaves the posterior as it was
+        self.assertEqual(posterior.table, (56, 126, 366, 354))
+        self.assertEqual(posterior.eqt_int(), before)
+        self.assertRaises(ValueError, Posterior, 56, 126, 366, 354, (0, 0, 0, 0), "risk", 2)
+        self.assertRaises(ValueError, Posterior, 56, 126, 366, 354, (0, 0, 0, 0), "diff", 0.05)
+        self.assertRaises(NotImplementedError, Posterior, 56, 126, 366, 354, (0, 0, 0, 0),
+                          "odds", 0.05)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+'''
+Testing the posterior tail probability function
+'''
+from __future__ import division
+import unittest
+import numpy as np
+from bayesint import prob_ratio_exceeds
+
+PROB_RATIO_EXCEEDS_INPUTS = [
+    (56, 126, 366, 354, (0, 0, 0, 0), "risk", 0.43),
+    (56, 126, 366, 354, (0, 0, 0, 0), "risk", 1.0),
+    (25, 108, 123, 313, (1/2, 1/2, 1/2, 1/2), "risk", 1.0),
+    (25, 108, 123, 313, (1/2, 1/2, 1/2, 1/2), "risk", 1.5),
+    (120, 126, 366, 354, (1, 1, 1, 1), "risk", 0.98),
+    (3, 2, 10, 12, (1, 1, 1, 1), "risk", 0.3),
+    (3, 2, 10, 12, (1, 1, 1, 1), "risk", 0.0)
+    ]
+
+# One minus the distributions of test_distri_frac_num
+PROB_RATIO_EXCEEDS_OUTPUTS = [
+    0.49104467362993647,
+    1.181223e-10,
+    0.00154771424065072,
+    1.398005787e-8,
+    0.27534045455695501,
+    0.99127702847641194,
+    1.0
+    ]
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test the tail probability function
+    '''
+    def test_prob_ratio_exceeds(self):
+        for input_set, output_set in zip(PROB_RATIO_EXCEEDS_INPUTS,
+                                         PROB_RATIO_EXCEEDS_OUTPUTS):
+            test_result = prob_ratio_exceeds(*input_set)
+            self.assertIsInstance(test_result, float)
+            self.assertAlmostEqual(test_result,
+                                   output_set,
+                                   delta=1e-6 * output_set,
+                                   msg='The result for {} gave {}, expected {}.'
+                                   ''.format(input_set, test_result, output_set))
+
+    def test_arrays(self):
+        counts = [np.array([input_set[idx] for input_set in PROB_RATIO_EXCEEDS_INPUTS[:2]])
+                  for idx in range(4)]
+        test_result = prob_ratio_exceeds(*counts, pri_val=(0, 0, 0, 0), frac_type="risk",
+                                         threshold=[[0.43], [1.0]])
+        self.assertEqual(test_result.shape, (2, 2))
+        for test_value, expected_value in zip(np.diag(test_result),
+                                              PROB_RATIO_EXCEEDS_OUTPUTS[:2]):
+            self.assertAlmostEqual(test_value, expected_value, delta=1e-6 * expected_value)
+        self.assertEqual(test_result[0, 0], test_result[0, 1])
+
+    def test_nan_threshold(self):
+        test_result = prob_ratio_exceeds(56, 126, 366, 354, (0, 0, 0, 0), "risk",
+                                         [0.43, np.nan, 0.0])
+        self.assertTrue(np.isnan(test_result[1]))
+        self.assertAlmostEqual(test_result[0], PROB_RATIO_EXCEEDS_OUTPUTS[0],
+                               delta=1e-6 * PROB_RATIO_EXCEEDS_OUTPUTS[0])
+        self.assertEqual(test_result[2], 1.0)
+        self.assertTrue(np.isnan(prob_ratio_exceeds(56, 126, 366, 354, (0, 0, 0, 0),
+                                                    "risk", float('nan'))))
+
+    def test_errors(self):
+        with self.assertRaises(TypeError):
+            prob_ratio_exceeds([56.5], 126, 366, 354, (0, 0, 0, 0), "risk", 1.0)
+        with self.assertRaises(NotImplementedError):
+            prob_ratio_exceeds(56, 126, 366, 354, (0, 0, 0, 0), "odds", 1.0)
+        # Errors name the counts as given, not as swapped for the upper tail
+        with self.assertRaises(ValueError) as context:
+            prob_ratio_exceeds(0, 126, 366, 354, (0, 0, 0, 0), "risk", 1.0)
+        self.assertTrue(str(context.exception).startswith('P '))
+        with self.assertRaises(ValueError) as context:
+            prob_ratio_exceeds(56, 126, 366, 126, (0, 0, 0, 0), "risk", 1.0)
+        self.assertTrue(str(context.exception).startswith('N - C '))
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,62 @@
+'''
+Testing the many-versus-reference intervals
+'''
+from __future__ import division
+import unittest
+import numpy as np
+from bayesint import eqt_int_frac, hpd_int_frac, reference_intervals, RESULT_DTYPE
+
+# Reference group (c_val, n_val), compared groups (p_val, m_val) and priors
+REFERENCE_INPUTS = [
+    (126, 354, [56, 60, 120, 3], [366, 400, 366, 10], (0, 0, 0, 0)),
+    (108, 313, [25, 250], [123, 300], (1/2, 1/2, 1/2, 1/2)),
+    (2, 10, [5000], [20000], (0, 0, 0, 0)),
+    (5, 10, [101], [200], (1/2, 1/2, 1/2, 1/2))
+    ]
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test the intervals against a shared reference group
+    '''
+    def test_reference_intervals(self):
+        for c_val, n_val, p_vals, m_vals, pri_val in REFERENCE_INPUTS:
+            for int_type in ('equal', 'hpd'):
+                test_result = reference_intervals(c_val, n_val, p_vals, m_vals, pri_val,
+                                                  "risk", 0.05, int_type)
+                self.assertEqual(test_result.dtype, RESULT_DTYPE)
+                for row, (p_val, m_val) in zip(test_result, zip(p_vals, m_vals)):
+                    if int_type == 'equal':
+                        expected = eqt_int_frac(p_val, c_val, m_val, n_val, pri_val,
+                                                "risk", 0.05, "numeric")
+                    else:
+                        expected = hpd_int_frac(p_val, c_val, m_val, n_val, pri_val,
+                                                "risk", 0.05, None, ans="numeric")
+                    self.assertEqual((row['p_val'], row['c_val'], row['m_val'], row['n_val']),
+                                     (p_val, c_val, m_val, n_val))
+                    for test_value, expected_value in zip(
+                            (row['ratio'], row['lower'], row['upper']), expected):
+                        self.assertAlmostEqual(test_value, expected_value, places=7,
+                                               msg='The result for {} gave {}, expected {}.'
+                                               ''.format((p_val, c_val, m_val, n_val),
+                                                         row, expected))
+
+    def test_out(self):
+        out = np.zeros(3, dtype=RESULT_DTYPE)
+        test_result = reference_intervals(126, 354, [56, 60], [366, 400], (0, 0, 0, 0),
+                                          "risk", 0.05, out=out)
+        self.assertEqual(len(test_result), 2)
+        self.assertEqual(out[1]['p_val'], 60)
+        self.assertEqual(len(reference_intervals(126, 354, [], [], (0, 0, 0, 0),
+                                                 "risk", 0.05)), 0)
+
+    def test_errors(self):
+        with self.assertRaises(TypeError):
+            reference_intervals(126, 354, [56.5], [366], (0, 0, 0, 0), "risk", 0.05)
+        with self.assertRaises(ValueError):
+            reference_intervals(126, 354, [56, 60], [366], (0, 0, 0, 0), "risk", 0.05)
+        with self.assertRaises(ValueError):
+            reference_intervals(0, 354, [56], [366], (0, 0, 0, 0), "risk", 0.05)
+        with self.assertRaises(ValueError):
+            reference_intervals(126, 354, [56], [366], (0, 0, 0, 0), "risk", 0.05, "both")
+        with self.assertRaises(NotImplementedError):
+            reference_intervals(126, 354, [56], [366], (0, 0, 0, 0), "odds", 0.05)
@@ -0,0 +1,100 @@
+'''
+Testing the numeric result objects and arrays
+'''
+import unittest
+import numpy as np
+from bayesint import (eqt_int_frac, hpd_int_frac, interval_batch, pack_results,
+                      IntervalResult, RESULT_DTYPE)
+from sympy import Rational
+
+RESULTS_INPUTS = [
+    (56, 126, 366, 354),
+    (25, 108, 123, 313)
+    ]
+
+RESULTS_OUTPUTS = [
+    (Rational(236, 549), 0.184135819539239, 0.667343920284484),
+    (Rational(7825, 13284), 0.324483034763110, 0.839177981791508)
+    ]
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test the result object and the structured arrays
+    '''
+    def test_interval_result(self):
+        result = IntervalResult.from_tuple(RESULTS_OUTPUTS[0])
+        self.assertIsInstance(result.ratio, float)
+        self.assertEqual(tuple(result), tuple(float(val) for val in RESULTS_OUTPUTS[0]))
+        frac, low, upp = result
+        self.assertEqual((frac, low, upp), (result.ratio, result.lower, result.upper))
+        self.assertIsNone(result.diagnostics)
+        with self.assertRaises(AttributeError):
+            result.width = upp - low
+
+    def test_result_type(self):
+        result = eqt_int_frac(*RESULTS_INPUTS[0], pri_val=(0, 0, 0, 0), frac_type="risk",
+                              signif=0.05, ans="estim", result_type="object")
+        self.assertIsInstance(result, IntervalResult)
+        for test_value, expected_value in zip(result, RESULTS_OUTPUTS[0]):
+            self.assertAlmostEqual(test_value, float(expected_value), places=1)
+        result = hpd_int_frac(*RESULTS_INPUTS[0], pri_val=(0, 0, 0, 0), frac_type="risk",
+                              signif=0.05, minimisation_start=None, result_type="object")
+        self.assertIsInstance(result, IntervalResult)
+        self.assertIn('nfev', result.diagnostics)
+        with self.assertRaises(ValueError):
+            eqt_int_frac(*RESULTS_INPUTS[0], pri_val=(0, 0, 0, 0), frac_type="risk",
+                         signif=0.05, ans="exact", result_type="object")
+        with self.assertRaises(ValueError):
+            eqt_int_frac(*RESULTS_INPUTS[0], pri_val=(0, 0, 0, 0), frac_type="risk",
+                         signif=0.05, ans="estim", result_type="dict")
+
+    def test_pack_results(self):
+        packed = pack_results(RESULTS_INPUTS, RESULTS_OUTPUTS)
+        self.assertEqual(packed.dtype, RESULT_DTYPE)
+        self.assertEqual(packed['n_val'].tolist(), [354, 313])
+        self.assertEqual(packed['lower'][1], 0.324483034763110)
+        with self.assertRaises(ValueError):
+            pack_results(RESULTS_INPUTS, RESULTS_OUTPUTS[:1])
+
+    def test_interval_batch(self):
+        out = np.zeros(3, dtype=RESULT_DTYPE)
+        batch = interval_batch(RESULTS_INPUTS, (0, 0, 0, 0), "risk", 0.05, out=out)
+        self.assertEqual(len(batch), 2)
+        for row, output_set in zip(out[:2], RESULTS_OUTPUTS):
+            for field, expected_value in zip(('ratio', 'lower', 'upper'), output_set):
+                self.assertAlmostEqual(row[field], float(expected_value), places=1)
+        with self.assertRaises(ValueError):
+            interval_batch(RESULTS_INPUTS, (0, 0, 0, 0), "risk", 0.05, int_type="both")
+
+    def test_interval_batch_array(self):
+        batch = interval_batch(np.array(RESULTS_INPUTS), (0, 0, 0, 0), "risk", 0.05)
+        self.assertEqual(batch['p_val'].tolist(), [56, 25])
+        self.assertTrue(np.all(np.isfinite(batch['lower'])))
+        with self.assertRaises(TypeError):
+            interval_batch(np.array(RESULTS_INPUTS, dtype=float), (0, 0, 0, 0), "risk", 0.05)
+        # A table that cannot be fitted gets NaN, the others are still filled
+        batch = interval_batch(RESULTS_INPUTS + [(400, 126, 366, 354)], (0, 0, 0, 0),
+                               "risk", 0.05)
+        self.assertTrue(np.all(np.isnan(batch[2][['ratio', 'lower', 'upper']].tolist())))
+        self.assertTrue(np.all(np.isfinite(batch['upper'][:2])))
+
+    def test_interval_batch_options(self):
+        batch = interval_batch(RESULTS_INPUTS, (0, 0, 0, 0), "risk", 0.05, ans="numeric")
+        for row, table in zip(batch, RESULTS_INPUTS):
+            expected = eqt_int_frac(*table, pri_val=(0, 0, 0, 0), frac_type="risk",
+                                    signif=0.05, ans="numeric")
+            self.assertEqual(tuple(row[['ratio', 'lower', 'upper']].tolist()), expected)
+        # Options every table would fail on are errors, not rows of NaN
+        with self.assertRaises(ValueError):
+            interval_batch(RESULTS_INPUTS, (0, 0, 0, 0), "rsik", 0.05)
+        with self.assertRaises(ValueError):
+            interval_batch(RESULTS_INPUTS, (0, 0, 0, 0), "risk", 5)
+        with self.assertRaises(ValueError):
+            interval_batch(RESULTS_INPUTS, (0, 0, 0, 0), "risk", 0.05, ans="exact")
+        with self.assertRaises(NotImplementedError):
+            interval_batch(RESULTS_INPUTS, (0, 0, 0, 0), "odds", 0.05, ans="numeric")
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
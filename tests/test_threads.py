@@ -0,0 +1,82 @@
+'''
+Stress testing the numerical intervals under a thread pool
+'''
+from __future__ import division
+import unittest
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from timeit import default_timer
+from bayesint import eqt_int_frac, hpd_int_frac
+
+THREADS_INPUTS = [
+    (56, 126, 366, 354, (0, 0, 0, 0), "risk", 0.05),
+    (25, 108, 123, 313, (0, 0, 0, 0), "risk", 0.05),
+    (56, 126, 366, 354, (1/2, 1/2, 1/2, 1/2), "risk", 0.05),
+    (25, 108, 123, 313, (1, 2, 3, 4), "risk", 0.05),
+    (3, 2, 10, 12, (1, 1, 1, 1), "risk", 0.05),
+    (5000, 4000, 25000, 34000, (0, 0, 0, 0), "risk", 0.01)
+    ]
+
+# Equal-tailed and highest posterior density bounds of the first two tables
+THREADS_OUTPUTS = [
+    ((0.3212470546315755, 0.5626344051198027), (0.31513234691167347, 0.5549855192598931)),
+    ((0.3880586233338228, 0.8396212003831929), (0.37516663659507926, 0.8229012057859018))
+    ]
+
+# Number of times each table is submitted to the pool
+REPEATS = 4
+WORKERS = 4
+# Smallest speedup of the pool over one thread; most of the work runs in
+# NumPy and SciPy calls on large arrays, which release the GIL
+MIN_SPEEDUP = 1.5
+
+def _intervals(input_set):
+    return (eqt_int_frac(*input_set, ans="numeric"),
+            hpd_int_frac(*input_set, minimisation_start=None, ans="numeric"))
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test the numerical intervals from many threads at once
+    '''
+    def test_numeric_intervals(self):
+        for input_set, output_set in zip(THREADS_INPUTS, THREADS_OUTPUTS):
+            eqt, hpd = _intervals(input_set)
+            for test_result, expected in zip((eqt, hpd), output_set):
+                self.assertIsInstance(test_result[0], float)
+                for test_value, expected_value in zip(test_result[1:], expected):
+                    self.assertAlmostEqual(test_value, expected_value, places=8,
+                                           msg='The result for {} gave {}, expected {}.'
+                                           ''.format(input_set, test_result, expected))
+
+    def test_thread_pool(self):
+        serial = [_intervals(input_set) for input_set in THREADS_INPUTS]
+        pool = ThreadPool(WORKERS)
+        try:
+            threaded = pool.map(_intervals, THREADS_INPUTS * REPEATS)
+        finally:
+            pool.close()
+        self.assertEqual(threaded, serial * REPEATS,
+                         'Threads must give the same results as a single thread.')
+
+    @unittest.skipIf(cpu_count() < WORKERS, 'needs at least {} processors'.format(WORKERS))
+    def test_thread_speedup(self):
+        tasks = THREADS_INPUTS * REPEATS
+        start = default_timer()
+        for input_set in tasks:
+            _intervals(input_set)
+        serial_time = default_timer() - start
+        pool = ThreadPool(WORKERS)
+        try:
+            start = default_timer()
+            pool.map(_intervals, tasks)
+            threaded_time = default_timer() - start
+        finally:
+            pool.close()
+        self.assertGreater(serial_time / threaded_time, MIN_SPEEDUP,
+                           'A pool of {} threads took {:.2f} s against {:.2f} s in one.'
+                           ''.format(WORKERS, threaded_time, serial_time))
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,70 @@
+'''
+Testing the JSON-lines worker
+'''
+import io
+import json
+import unittest
+from bayesint.worker import serve
+
+WORKER_INPUTS = [
+    {"id": 1, "method": "eqt", "counts": [56, 126, 366, 354],
+     "pri_val": [0, 0, 0, 0], "frac_type": "risk", "signif": 0.05},
+    {"id": 2, "method": "eqt", "counts": [56, 126, 366, 354],
+     "pri_val": [0, 0, 0, 0], "frac_type": "risk", "signif": 0.05},
+    {"id": 3, "method": "hpd", "counts": [25, 108, 123, 313],
+     "pri_val": [0, 0, 0, 0], "frac_type": "risk", "signif": 0.05,
+     "minimisation_start": [0.4, 7825.0/13284]},
+    {"id": 4, "method": "eqt", "counts": [56, 126, 366.5, 354]},
+    {"id": 5, "method": "median", "counts": [56, 126, 366, 354]},
+    {"id": 6, "method": "eqt", "counts": [56, 126, 366, 354],
+     "pri_val": [0, 0, 0, 0], "frac_type": "risk", "signif": 0.05, "ans": "estim"},
+    {"id": 7, "method": "eqt", "counts": [56, 126, 366, 354], "ans": "guess"}
+    ]
+
+WORKER_OUTPUTS = [
+    (7825.0/13284, 0.3503450323429196, 0.866347221610741),
+    (0.42987249544626593, 0.32124705463159703, 0.562634405120767),
+    (0.42987249544626593, 0.184135819539239, 0.667343920284484)
+    ]
+
+class BayesintTests(unittest.TestCase):
+    '''
+    Test the worker loop
+    '''
+    def test_serve(self):
+        instream = io.StringIO(u'\n'.join(json.dumps(request)
+                                          for request in WORKER_INPUTS) + u'\n')
+        outstream = io.StringIO()
+        serve(instream, outstream, warm_up=False)
+        replies = [json.loads(line) for line in outstream.getvalue().splitlines()]
+        self.assertEqual([reply['id'] for reply in replies], [1, 2, 3, 4, 5, 6, 7],
+                         'serve must answer every request in order.')
+        self.assertNotIn('cached', replies[0])
+        self.assertTrue(replies[1].get('cached'),
+                        'A repeated request must be answered from the cache.')
+        self.assertEqual(replies[0]['result'], replies[1]['result'])
+        for test_value, expected_value in zip(replies[2]['result'], WORKER_OUTPUTS[0]):
+            self.assertAlmostEqual(test_value, expected_value, places=1)
+        self.assertTrue(replies[3]['error'].startswith('TypeError'))
+        self.assertTrue(replies[4]['error'].startswith('ValueError'))
+        # The numerical answer is the default, and the kind of answer is part
+        # of the cache key
+        self.assertNotIn('cached', replies[5])
+        for reply, expected in ((replies[0], WORKER_OUTPUTS[1]), (replies[5], WORKER_OUTPUTS[2])):
+            for test_value, expected_value in zip(reply['result'], expected):
+                self.assertAlmostEqual(test_value, expected_value, places=7)
+        self.assertTrue(replies[6]['error'].startswith('ValueError'))
+
+    def test_bad_line(self):
+        outstream = io.StringIO()
+        serve(io.StringIO(u'not json\n[1, 2]\n'), outstream, warm_up=False)
+        replies = [json.loads(line) for line in outstream.getvalue().splitlines()]
+        self.assertEqual(len(replies), 2)
+        for reply in replies:
+            self.assertIsNone(reply['id'])
+            self.assertIn('error', reply)
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()